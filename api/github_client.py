@@ -0,0 +1,206 @@
+"""
+Async client for the GitHub repository search API.
+
+python_repos.py makes one blocking request and only sees the first 30 results. This client:
+- shares one aiohttp session (and its connection pool) for every request
+- asks for 100 results per page and fetches every page of a query concurrently
+- runs several queries at once, with a semaphore bounding the requests in flight
+- retries failures with tenacity, waiting as long as GitHub asks through the Retry-After
+  and X-RateLimit-Remaining / X-RateLimit-Reset headers
+- optionally sends conditional requests through an HttpCache (see http_cache.py), so pages
+  that did not change come back as 304 and are read from disk
+- with `fields`, streams each page through json_stream and keeps only those fields of every
+  item, without decoding the rest; the cache still stores the raw body
+
+`base_url` can point at a local stub server, which is how github_client_test.py runs it.
+"""
+import asyncio
+import json
+import math
+import os
+import time
+from email.utils import parsedate_to_datetime
+
+import aiohttp
+from tenacity import AsyncRetrying, retry_if_exception, stop_after_attempt, wait_exponential
+
+from json_stream import ItemStream, aiter_response_items
+
+API_URL = "https://api.github.com"
+SEARCH_RESULTS_LIMIT = 1000  # GitHub never returns more than this for one search
+
+
+class RateLimited(Exception):
+    """GitHub refused a request until `wait` seconds have passed."""
+
+    def __init__(self, wait):
+        super().__init__(f"Rate limited, retry in {wait:.1f}s")
+        self.wait = wait
+
+
+def rate_limit_wait(status, headers, now=None):
+    """Seconds to wait before retrying, or None when the response is not rate limited.
+
+    Retry-After may be a number of seconds or an HTTP date (RFC 9110).
+    """
+    if status not in (403, 429):
+        return None
+    now = time.time() if now is None else now
+    if 'Retry-After' in headers:
+        value = headers['Retry-After']
+        try:
+            return float(value)
+        except ValueError:
+            pass
+        try:
+            return max(0.0, parsedate_to_datetime(value).timestamp() - now)
+        except (TypeError, ValueError):
+            pass  # unreadable: try the X-RateLimit headers
+    if headers.get('X-RateLimit-Remaining') == '0' and 'X-RateLimit-Reset' in headers:
+        return max(0.0, float(headers['X-RateLimit-Reset']) - now)
+    return None
+
+
+def retryable(error):
+    """Rate limits, timeouts, connection errors and 5xx responses; other 4xx will not get better."""
+    if isinstance(error, aiohttp.ClientResponseError):
+        return error.status >= 500
+    return isinstance(error, (RateLimited, aiohttp.ClientError, asyncio.TimeoutError))
+
+
+def decode_page(body, fields=None):
+    """A JSON body as a dict; with `fields`, its items projected to those fields."""
+    if fields is None:
+        return json.loads(body)
+    stream = ItemStream(fields)
+    items = stream.feed(body) + stream.close()
+    return {**stream.top, 'items': items}
+
+
+class GitHubSearchClient:
+    """Fetch repository search results, all pages and many queries concurrently."""
+
+    def __init__(self, base_url=API_URL, token=None, concurrency=8, per_page=100,
+                 max_pages=None, max_attempts=5, max_wait=60, timeout=30, cache=None):
+        self.base_url = base_url.rstrip('/')
+        self.token = token if token is not None else os.environ.get('GITHUB_TOKEN')
+        self.concurrency = concurrency
+        self.per_page = per_page
+        self.max_pages = max_pages or SEARCH_RESULTS_LIMIT // per_page
+        self.max_attempts = max_attempts
+        self.max_wait = max_wait
+        self.timeout = timeout
+        self.cache = cache
+        self.session = None
+        self._semaphore = None
+        self._resume_at = 0.0  # when the rate limit window says we may send again
+
+    async def __aenter__(self):
+        headers = {"Accept": "application/vnd.github.v3+json"}
+        if self.token:
+            headers["Authorization"] = f"Bearer {self.token}"
+        self.session = aiohttp.ClientSession(
+            headers=headers,
+            connector=aiohttp.TCPConnector(limit=self.concurrency),
+            timeout=aiohttp.ClientTimeout(total=self.timeout),
+        )
+        self._semaphore = asyncio.Semaphore(self.concurrency)
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.session.close()
+
+    def _wait(self, retry_state):
+        """Wait what GitHub asked for on a rate limit, back off exponentially otherwise."""
+        error = retry_state.outcome.exception()
+        if isinstance(error, RateLimited):
+            return min(error.wait, self.max_wait)
+        return wait_exponential(multiplier=0.5, max=self.max_wait)(retry_state)
+
+    async def _get(self, url, params, fields=None):
+        loop = asyncio.get_running_loop()
+        entry = self.cache.get(url, params) if self.cache else None
+        headers = entry.conditional_headers() if entry else None
+        async with self._semaphore:
+            if (delay := self._resume_at - loop.time()) > 0:
+                await asyncio.sleep(delay)
+            async with self.session.get(url, params=params, headers=headers) as response:
+                wait = rate_limit_wait(response.status, response.headers)
+                if wait is not None:
+                    self._resume_at = max(self._resume_at, loop.time() + min(wait, self.max_wait))
+                    raise RateLimited(wait)
+                if response.headers.get('X-RateLimit-Remaining') == '0':
+                    reset = float(response.headers.get('X-RateLimit-Reset', time.time()))
+                    self._resume_at = loop.time() + min(max(0.0, reset - time.time()), self.max_wait)
+                if response.status == 304 and entry is not None:
+                    return decode_page(self.cache.hit(entry), fields)
+                response.raise_for_status()
+                if fields is None:
+                    body = await response.read()
+                    page = json.loads(body)
+                else:
+                    stream = ItemStream(fields, keep_body=self.cache is not None)
+                    items = [item async for item in aiter_response_items(response, fields, stream=stream)]
+                    body, page = stream.body, {**stream.top, 'items': items}
+                if self.cache:
+                    self.cache.put(url, params, bytes(body),
+                                   response.headers.get('ETag'), response.headers.get('Last-Modified'))
+                return page
+
+    async def get(self, path, params, fields=None):
+        """GET a JSON document, retrying rate limits, timeouts and server errors.
+
+        With `fields` the document is a search page: {'items': [...]} of projected items, plus
+        the top-level values (total_count...) that come before the items.
+        """
+        url = f"{self.base_url}{path}"
+        retrying = AsyncRetrying(
+            retry=retry_if_exception(retryable),
+            stop=stop_after_attempt(self.max_attempts),
+            wait=self._wait,
+            reraise=True,
+        )
+        try:
+            async for attempt in retrying:
+                with attempt:
+                    return await self._get(url, params, fields)
+        except (RateLimited, aiohttp.ClientError, asyncio.TimeoutError) as error:
+            if retryable(error) and self.cache and self.cache.serve_stale and (entry := self.cache.get(url, params)):
+                return decode_page(self.cache.stale(entry), fields)
+            raise
+
+    async def search_page(self, query, page, fields=None):
+        params = {'q': query, 'per_page': self.per_page, 'page': page}
+        return await self.get('/search/repositories', params, fields)
+
+    async def search(self, query, fields=None):
+        """Return every item of a search, fetching pages 2..n concurrently.
+
+        fields=('name', 'stargazers_count') returns items with only those keys.
+        """
+        first = await self.search_page(query, 1, fields)
+        pages = min(math.ceil(first.get('total_count', 0) / self.per_page), self.max_pages)
+        rest = await asyncio.gather(*(self.search_page(query, page, fields) for page in range(2, pages + 1)))
+        items = list(first['items'])
+        for page in rest:
+            items.extend(page['items'])
+        return items
+
+    async def search_many(self, queries, fields=None):
+        """Run several searches at once, returning {query: items}."""
+        results = await asyncio.gather(*(self.search(query, fields) for query in queries))
+        return dict(zip(queries, results))
+
+
+async def top_repositories(languages, min_stars=10000, fields=None, **client_options):
+    """Most starred repositories for each language, e.g. {'python': [...], 'go': [...]}."""
+    queries = {f"language:{language} sort:stars stars:>{min_stars}": language for language in languages}
+    async with GitHubSearchClient(**client_options) as client:
+        results = await client.search_many(list(queries), fields)
+    return {queries[query]: items for query, items in results.items()}
+
+
+if __name__ == '__main__':
+    repos = asyncio.run(top_repositories(['python', 'javascript', 'go']))
+    for language, items in repos.items():
+        print(f"{language}: {len(items)} repositories")
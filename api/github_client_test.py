@@ -0,0 +1,127 @@
+import asyncio
+
+import aiohttp
+import pytest
+from aiohttp import web
+from github_client import GitHubSearchClient, rate_limit_wait
+from http_cache import HttpCache
+
+
+async def run_against_stub(total_count, rate_limited_pages, test, cache=None, server=None):
+    """Start a local search API stub, run `test(client, requests)` against it."""
+    requests = []
+    server = server if server is not None else {'failing': False}
+
+    async def search(request):
+        page = int(request.query['page'])
+        per_page = int(request.query['per_page'])
+        requests.append((request.query['q'], page))
+        if server['failing']:
+            return web.json_response({}, status=server.get('status', 500))
+        if page in rate_limited_pages:
+            rate_limited_pages.remove(page)
+            return web.json_response({}, status=403, headers={'Retry-After': '0', 'X-RateLimit-Remaining': '0'})
+        etag = f'"{request.query["q"]}-{page}"'
+        if request.headers.get('If-None-Match') == etag:
+            return web.Response(status=304, headers={'ETag': etag})
+        start = (page - 1) * per_page
+        items = [{'name': f"repo{i}", 'stargazers_count': total_count - i, 'owner': {'login': 'octo'}}
+                 for i in range(start, min(start + per_page, total_count))]
+        return web.json_response({'total_count': total_count, 'items': items}, headers={'ETag': etag})
+
+    app = web.Application()
+    app.router.add_get('/search/repositories', search)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    try:
+        async with GitHubSearchClient(f"http://127.0.0.1:{port}", token='', concurrency=3,
+                                      max_attempts=2, max_wait=0.01, cache=cache) as client:
+            return await test(client, requests)
+    finally:
+        await runner.cleanup()
+
+def test_search_fetches_every_page_and_retries_rate_limits():
+    async def test(client, requests):
+        items = await client.search('language:python')
+        assert [item['name'] for item in items] == [f"repo{i}" for i in range(250)]
+        assert sorted(page for _, page in requests) == [1, 2, 2, 3]
+
+    asyncio.run(run_against_stub(250, {2}, test))
+
+def test_search_many_runs_every_query():
+    async def test(client, requests):
+        results = await client.search_many(['language:go', 'language:rust'])
+        assert {query: len(items) for query, items in results.items()} == {'language:go': 120, 'language:rust': 120}
+
+    asyncio.run(run_against_stub(120, set(), test))
+
+def test_rate_limit_wait_uses_reset_header():
+    headers = {'X-RateLimit-Remaining': '0', 'X-RateLimit-Reset': '1010'}
+    assert rate_limit_wait(403, headers, now=1000) == 10
+    assert rate_limit_wait(200, headers, now=1000) is None
+
+def test_rate_limit_wait_reads_http_dates():
+    date = 'Wed, 21 Oct 2015 07:28:00 GMT'  # 1445412480
+    assert rate_limit_wait(429, {'Retry-After': date}, now=1445412470) == 10
+    assert rate_limit_wait(429, {'Retry-After': date}, now=1445412490) == 0
+    assert rate_limit_wait(429, {'Retry-After': '120'}) == 120
+    assert rate_limit_wait(403, {'Retry-After': 'soon', 'X-RateLimit-Remaining': '0',
+                                 'X-RateLimit-Reset': '1010'}, now=1000) == 10
+
+def test_conditional_requests_are_served_from_cache(tmp_path):
+    cache = HttpCache(tmp_path, serve_stale=True)
+    server = {'failing': False}
+
+    async def test(client, requests):
+        first = await client.search('language:python')
+        second = await client.search('language:python')
+        server['failing'] = True
+        stale = await client.search('language:python')
+        return first, second, stale
+
+    first, second, stale = asyncio.run(run_against_stub(250, set(), test, cache, server))
+    assert first == second == stale
+    assert (cache.stats.misses, cache.stats.hits, cache.stats.stale) == (3, 3, 3)
+    assert cache.stats.bytes_saved == cache.size
+
+def test_projected_search_streams_fields_and_caches_raw_bodies(tmp_path):
+    cache = HttpCache(tmp_path)
+    fields = ('name', 'stargazers_count')
+
+    async def test(client, requests):
+        projected = await client.search('language:python', fields=fields)
+        full = await client.search('language:python')  # 304s, answered from the raw cached bodies
+        again = await client.search('language:python', fields=fields)
+        return projected, full, again
+
+    projected, full, again = asyncio.run(run_against_stub(250, set(), test, cache))
+    assert projected == again == [{'name': f"repo{i}", 'stargazers_count': 250 - i} for i in range(250)]
+    assert full[0] == {'name': 'repo0', 'stargazers_count': 250, 'owner': {'login': 'octo'}}
+    assert (cache.stats.misses, cache.stats.hits) == (3, 6)
+
+    async def uncached(client, requests):
+        return await client.search('language:python', fields=fields)
+
+    assert asyncio.run(run_against_stub(250, set(), uncached)) == projected
+
+def test_client_errors_are_not_retried():
+    async def test(client, requests):
+        with pytest.raises(aiohttp.ClientResponseError) as error:
+            await client.search('language:python')
+        assert error.value.status == 422
+        assert len(requests) == 1
+
+    asyncio.run(run_against_stub(250, set(), test, server={'failing': True, 'status': 422}))
+
+def test_cache_evicts_least_recently_used(tmp_path):
+    cache = HttpCache(tmp_path, max_bytes=10)
+    cache.put('http://x/a', None, b'aaaa', etag='"a"')
+    cache.put('http://x/b', None, b'bbbb', etag='"b"')
+    cache.get('http://x/a')
+    cache.put('http://x/c', None, b'cccc', etag='"c"')
+    assert cache.get('http://x/b') is None
+    assert cache.get('http://x/a').body == b'aaaa'
+    assert HttpCache(tmp_path, max_bytes=10).size == 8
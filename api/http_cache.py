@@ -0,0 +1,137 @@
+"""
+On-disk cache of HTTP responses for conditional requests.
+
+Each response body is stored as <key>.body with a <key>.json sidecar holding the URL, ETag and
+Last-Modified headers. Before a request the client asks for the cached entry and sends
+If-None-Match / If-Modified-Since; a 304 answer means the stored body is still current, so it
+is served from disk without downloading (and, on GitHub, without using up rate limit).
+
+The cache is bounded by `max_bytes`: the least recently used entries are evicted first. With
+`serve_stale=True` a cached body is returned when the request fails altogether.
+"""
+import hashlib
+import json
+import os
+import tempfile
+from collections import OrderedDict
+from pathlib import Path
+from urllib.parse import urlencode
+
+
+class CacheStats:
+    """Counters to measure what the cache saves."""
+
+    def __init__(self):
+        self.hits = 0  # 304 answers served from disk
+        self.misses = 0  # full downloads
+        self.stale = 0  # served from disk because the request failed
+        self.bytes_saved = 0  # body bytes not downloaded thanks to a hit
+        self.evictions = 0
+
+    def __repr__(self):
+        return (f"CacheStats(hits={self.hits}, misses={self.misses}, stale={self.stale}, "
+                f"bytes_saved={self.bytes_saved}, evictions={self.evictions})")
+
+
+class CacheEntry:
+    def __init__(self, key, url, body, etag=None, last_modified=None):
+        self.key = key
+        self.url = url
+        self.body = body
+        self.etag = etag
+        self.last_modified = last_modified
+
+    def conditional_headers(self):
+        """Headers that turn a GET into a conditional GET for this entry."""
+        headers = {}
+        if self.etag:
+            headers['If-None-Match'] = self.etag
+        if self.last_modified:
+            headers['If-Modified-Since'] = self.last_modified
+        return headers
+
+
+def cache_key(url, params=None):
+    if params:
+        url = f"{url}?{urlencode(sorted(params.items()))}"
+    return url, hashlib.sha1(url.encode('utf-8')).hexdigest()
+
+
+def _write_atomic(path, data):
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}-")
+    with os.fdopen(fd, 'wb') as outfile:
+        outfile.write(data)
+    os.replace(tmp, path)
+
+
+class HttpCache:
+    """Size bounded LRU store of response bodies and their validators."""
+
+    def __init__(self, directory, max_bytes=64 * 1024 * 1024, serve_stale=False):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.serve_stale = serve_stale
+        self.stats = CacheStats()
+        # key -> body size, least recently used first (file mtime survives restarts)
+        bodies = sorted(self.directory.glob('*.body'), key=lambda path: path.stat().st_mtime_ns)
+        self._sizes = OrderedDict((path.stem, path.stat().st_size) for path in bodies)
+        self.size = sum(self._sizes.values())
+
+    def _paths(self, key):
+        return self.directory / f"{key}.body", self.directory / f"{key}.json"
+
+    def get(self, url, params=None):
+        """Cached entry for a request, or None."""
+        url, key = cache_key(url, params)
+        if key not in self._sizes:
+            return None
+        body_path, meta_path = self._paths(key)
+        try:
+            meta = json.loads(meta_path.read_text())
+            body = body_path.read_bytes()
+        except (OSError, ValueError):
+            self._forget(key)
+            return None
+        self._touch(key)
+        return CacheEntry(key, url, body, meta.get('etag'), meta.get('last_modified'))
+
+    def put(self, url, params, body, etag=None, last_modified=None):
+        """Store a fresh 200 response; responses without validators are not cached."""
+        self.stats.misses += 1
+        if not (etag or last_modified) or len(body) > self.max_bytes:
+            return
+        url, key = cache_key(url, params)
+        body_path, meta_path = self._paths(key)
+        _write_atomic(body_path, body)
+        meta = {'url': url, 'etag': etag, 'last_modified': last_modified}
+        _write_atomic(meta_path, json.dumps(meta).encode('utf-8'))
+        self.size += len(body) - self._sizes.pop(key, 0)
+        self._sizes[key] = len(body)
+        self._evict()
+
+    def hit(self, entry):
+        """Record a 304: the cached body was reused."""
+        self.stats.hits += 1
+        self.stats.bytes_saved += len(entry.body)
+        return entry.body
+
+    def stale(self, entry):
+        """Record a failed request answered from the cache."""
+        self.stats.stale += 1
+        return entry.body
+
+    def _touch(self, key):
+        self._sizes.move_to_end(key)
+        os.utime(self._paths(key)[0])
+
+    def _forget(self, key):
+        self.size -= self._sizes.pop(key, 0)
+        for path in self._paths(key):
+            path.unlink(missing_ok=True)
+
+    def _evict(self):
+        while self.size > self.max_bytes and self._sizes:
+            oldest = next(iter(self._sizes))
+            self._forget(oldest)
+            self.stats.evictions += 1
@@ -0,0 +1,215 @@
+"""
+Incremental extraction of a few fields from a large JSON array of objects.
+
+python_repos.py only needs `name` and `stargazers_count`, but r.json() decodes the whole
+response, every field of every repository, into dicts. ItemStream is fed the body chunk by
+chunk and yields, for each object in the "items" array, a small dict with just the requested
+fields. Only one item's text is held at a time, so memory does not grow with the page size.
+
+The top-level scalars before the array (GitHub's total_count) are kept in ItemStream.top.
+
+Scanning uses one compiled regex that jumps between strings and brackets (it runs in C);
+numbers, literals and commas are never looked at. The values of the requested fields are then
+decoded with json's raw_decode, straight from the buffer.
+"""
+import codecs
+import json
+import re
+import time
+import tracemalloc
+
+TOKEN = re.compile(r'(?P<string>"(?:[^"\\]|\\.)*")|(?P<partial>"(?:[^"\\]|\\.)*\\?\Z)|[{}\[\]:]')
+WHITESPACE = re.compile(r'\s*')
+_decoder = json.JSONDecoder()
+
+
+class ItemStream:
+    """Feed it bytes, get back the projected objects of one top-level array.
+
+    keep_body=True also keeps every byte fed in `body`, e.g. to cache the raw response.
+    """
+
+    def __init__(self, fields, array_key='items', keep_body=False):
+        self.fields = {json.dumps(field): field for field in fields}  # quoted key -> name
+        self.array_key = json.dumps(array_key)
+        self.top = {}  # top-level scalar values seen so far, e.g. {'total_count': 1234}
+        self.body = bytearray() if keep_body else None
+        self._text = codecs.getincrementaldecoder('utf-8')()
+        self._buf = ''
+        self._pos = 0
+        self._depth = 0
+        self._last_string = None
+        self._top_key = None
+        self._in_array = False
+        self._item_start = None
+        self._values = {}  # field -> position of its value in the buffer
+        self._top_value = None  # position of a top-level value not decoded yet
+        self.done = False
+
+    def feed(self, data):
+        """Add a chunk of the body; return the items completed by it."""
+        if self.body is not None:
+            self.body += data
+        if self.done:
+            return []
+        self._buf += self._text.decode(data)
+        return self._scan()
+
+    def close(self):
+        """Flush the decoder at the end of the body.
+
+        Once the array is done the rest of the body is not decoded at all, so there is
+        nothing to flush (and a character cut by the last chunk fed is no error).
+        """
+        items = self.feed(b'') if not self.done else []
+        if not self.done:
+            self._text.decode(b'', final=True)
+        return items
+
+    def _scan(self):
+        items = []
+        buf = self._buf
+        for match in TOKEN.finditer(buf, self._pos):
+            token = match.group()
+            kind = match.lastgroup
+            if kind == 'partial':  # string cut by the end of the chunk
+                self._pos = match.start()
+                break
+            self._pos = match.end()
+            if self._top_value is not None:
+                # The value is complete now that a token follows it; only scalars are kept.
+                if token not in '{[':
+                    start = WHITESPACE.match(buf, self._top_value).end()
+                    self.top[json.loads(self._top_key)] = _decoder.raw_decode(buf, start)[0]
+                self._top_value = None
+            if kind == 'string':
+                self._last_string = token
+            elif token == ':':
+                if self._item_start is not None and self._depth == 3 and self._last_string in self.fields:
+                    self._values[self.fields[self._last_string]] = match.end()
+                elif self._depth == 1:
+                    self._top_key = self._last_string
+                    self._top_value = match.end()
+            elif token in '{[':
+                self._depth += 1
+                if token == '[' and self._depth == 2 and self._top_key == self.array_key:
+                    self._in_array = True
+                elif token == '{' and self._in_array and self._depth == 3:
+                    self._item_start = match.start()
+                    self._values = {}
+            else:
+                self._depth -= 1
+                if self._in_array and self._depth == 2 and token == '}':
+                    items.append({
+                        field: _decoder.raw_decode(buf, WHITESPACE.match(buf, position).end())[0]
+                        for field, position in self._values.items()
+                    })
+                    self._item_start = None
+                elif self._in_array and self._depth == 1:
+                    self.done = True
+                    break
+        self._trim()
+        return items
+
+    def _trim(self):
+        """Forget everything before the current item (or scan position)."""
+        keep = self._pos if self._item_start is None else self._item_start
+        if self._top_value is not None:
+            keep = min(keep, self._top_value)
+        if keep:
+            self._buf = self._buf[keep:]
+            self._pos -= keep
+            if self._top_value is not None:
+                self._top_value -= keep
+            if self._item_start is not None:
+                self._item_start -= keep
+                self._values = {field: position - keep for field, position in self._values.items()}
+
+
+def iter_items(chunks, fields, array_key='items'):
+    """Yield the projected items from an iterable of byte chunks."""
+    stream = ItemStream(fields, array_key)
+    for chunk in chunks:
+        yield from stream.feed(chunk)
+        if stream.done:
+            return
+    yield from stream.close()
+
+
+def iter_response_items(response, fields, chunk_size=64 * 1024):
+    """Stream items from a requests response opened with stream=True."""
+    return iter_items(response.iter_content(chunk_size), fields)
+
+
+async def aiter_response_items(response, fields, chunk_size=64 * 1024, stream=None):
+    """Stream items from an aiohttp response.
+
+    Pass an ItemStream as `stream` to read its top-level values (and body) afterwards; one
+    made with keep_body=True gets the whole body, so the reading does not stop at the array.
+    """
+    stream = stream if stream is not None else ItemStream(fields)
+    async for chunk in response.content.iter_chunked(chunk_size):
+        for item in stream.feed(chunk):
+            yield item
+        if stream.done and stream.body is None:
+            return
+    for item in stream.close():
+        yield item
+
+
+def search_fixture(count, seed=0):
+    """A search/repositories body with `count` items shaped like GitHub's (about 90 fields)."""
+    import random
+
+    rng = random.Random(seed)
+    owner = {f"{key}_url": f"https://api.github.com/users/octo/{key}" for key in
+             ('avatar', 'followers', 'following', 'gists', 'starred', 'subscriptions',
+              'organizations', 'repos', 'events', 'received_events', 'html')}
+    items = []
+    for i in range(count):
+        item = {f"{key}_url": f"https://api.github.com/repos/octo/repo{i}/{key}" for key in
+                ('archive', 'assignees', 'blobs', 'branches', 'collaborators', 'comments', 'commits',
+                 'compare', 'contents', 'contributors', 'deployments', 'downloads', 'events',
+                 'forks', 'git_commits', 'git_refs', 'git_tags', 'hooks', 'issue_comment',
+                 'issue_events', 'issues', 'keys', 'labels', 'languages', 'merges', 'milestones',
+                 'notifications', 'pulls', 'releases', 'stargazers', 'statuses', 'subscribers',
+                 'subscription', 'tags', 'teams', 'trees', 'clone', 'mirror', 'svn')}
+        item.update({
+            'id': i, 'name': f"repo{i}", 'full_name': f"octo/repo{i}", 'private': False,
+            'owner': dict(owner, login='octo', id=1), 'description': "A \"quoted\" description " * 3,
+            'fork': False, 'stargazers_count': rng.randint(10000, 400000), 'language': 'Python',
+            'topics': ['python', 'learning', 'api'], 'license': {'key': 'mit', 'name': 'MIT License'},
+            'score': 1.0, 'has_issues': True, 'open_issues_count': rng.randint(0, 5000),
+        })
+        items.append(item)
+    return json.dumps({'total_count': count, 'incomplete_results': False, 'items': items}).encode('utf-8')
+
+
+def benchmark(body, fields=('name', 'stargazers_count'), chunk_size=64 * 1024):
+    """Compare json.loads (what r.json() does) with streaming extraction."""
+    def full():
+        return [{field: item[field] for field in fields} for item in json.loads(body)['items']]
+
+    def streaming():
+        chunks = (body[i:i + chunk_size] for i in range(0, len(body), chunk_size))
+        return list(iter_items(chunks, fields))
+
+    results = {}
+    for name, run in (('json.loads', full), ('streaming', streaming)):
+        tracemalloc.start()
+        start = time.perf_counter()
+        items = run()
+        elapsed = time.perf_counter() - start
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        results[name] = items
+        print(f"{name:>10}: {len(items)} items, {len(body) / elapsed / 1e6:6.1f} MB/s, "
+              f"peak {peak / 1e6:6.1f} MB")
+    assert results['json.loads'] == results['streaming']
+
+
+if __name__ == '__main__':
+    for count in (1_000, 10_000):
+        body = search_fixture(count)
+        print(f"{count} items, {len(body) / 1e6:.1f} MB body")
+        benchmark(body)
@@ -0,0 +1,41 @@
+import json
+
+import pytest
+from json_stream import ItemStream, iter_items, search_fixture
+
+
+@pytest.mark.parametrize('chunk_size', [1, 3, 1024])
+def test_streamed_items_match_full_decode(chunk_size):
+    body = search_fixture(20)
+    chunks = [body[i:i + chunk_size] for i in range(0, len(body), chunk_size)]
+    expected = [{'name': item['name'], 'owner': item['owner']} for item in json.loads(body)['items']]
+    assert list(iter_items(chunks, ['name', 'owner'])) == expected
+
+def test_only_top_level_items_array_is_read():
+    body = json.dumps({
+        'meta': {'items': [{'name': 'nested'}]},
+        'items': [{'name': 'café \\"x\\"', 'repo': {'name': 'inner'}}, {'stars': 1}],
+        'other': [{'name': 'after'}],
+    }, ensure_ascii=False).encode('utf-8')
+    chunks = [body[i:i + 2] for i in range(0, len(body), 2)]
+    assert list(iter_items(chunks, ['name'])) == [{'name': 'café \\"x\\"'}, {}]
+
+@pytest.mark.parametrize('chunk_size', [1, 7, 1024])
+def test_top_level_scalars_and_body_are_kept(chunk_size):
+    body = search_fixture(3)
+    stream = ItemStream(['name'], keep_body=True)
+    items = []
+    for i in range(0, len(body), chunk_size):
+        items += stream.feed(body[i:i + chunk_size])
+    items += stream.close()
+    assert [item['name'] for item in items] == ['repo0', 'repo1', 'repo2']
+    assert stream.top == {'total_count': 3, 'incomplete_results': False}
+    assert stream.body == body
+
+def test_character_split_after_the_array_is_not_an_error():
+    body = '{"items":[{"name":"a"}],"after":"é"}'.encode('utf-8')
+    cut = body.index('é'.encode('utf-8')) + 1
+    stream = ItemStream(['name'], keep_body=True)
+    items = stream.feed(body[:cut]) + stream.feed(body[cut:]) + stream.close()
+    assert items == [{'name': 'a'}]
+    assert stream.body == body
@@ -1,13 +1,17 @@
-import requests
+import asyncio
+
 import plotly.express as px
 
-# Make an API call and check the response.
-url = "https://api.github.com/search/repositories"
-url += "?q=language:python+sort:stars+stars:>10000"
-headers = {"Accept": "application/vnd.github.v3+json"}
-r = requests.get(url)
-response_json = r.json()
-items = response_json["items"]
+from github_client import top_repositories
+from http_cache import HttpCache
+
+# Fetch every page of the search concurrently over one session.
+# Unchanged pages come back as 304 and are read from the cache.
+# Only the two fields plotted below are extracted from each repository.
+cache = HttpCache('.http_cache', serve_stale=True)
+repos = asyncio.run(top_repositories(['python'], min_stars=10000, fields=('name', 'stargazers_count'), cache=cache))
+print(cache.stats)
+items = repos['python']
 repo_dict = items[0]
 for key in sorted(repo_dict.keys()):
     print(f"{key}: {repo_dict[key]}")
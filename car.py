@@ -10,17 +10,21 @@ class Car:
         self.odemeter_reading = mileage
 
 class Battery:
-    def __init__(self, battery_size = 40):
+    def __init__(self, battery_size = 40, sink = print):
         self.battery_size = battery_size
+        self.sink = sink  # called with every message, e.g. print or a telemetry.BufferedSink
+
+    def description(self):
+        return f"This battery has a {self.battery_size} kwh battery."
 
     def describe_battery(self):
-        """Initialize the battery's attributes."""
-        print(f"This battery has a {self.battery_size} kwh battery.")
+        """Send the battery's description to the sink."""
+        self.sink(self.description())
 
 class ElectricCar(Car):
-    def __init__(self, make, model, year, odemeter_reading = 0):
+    def __init__(self, make, model, year, odemeter_reading = 0, sink = print):
         super().__init__(make, model, year)
-        self.battery = Battery()
+        self.battery = Battery(sink = sink)
 
     def update_odemeter_reading(self, mileage):
         self.battery.describe_battery()
@@ -0,0 +1,97 @@
+import gc
+import io
+import sys
+import tracemalloc
+
+import numpy as np
+import pytest
+from car import Battery, Car, ElectricCar
+from fleet import Fleet
+from telemetry import BufferedSink, replay
+
+def discard(message):
+    pass
+
+FACTORIES = {
+    "Car": lambda: Car("BYD", "spa", 2025),
+    "ElectricCar": lambda: ElectricCar("BYD", "spa", 2025, sink=discard),
+    "Battery": lambda: Battery(sink=discard),
+}
+
+def bytes_per_instance(make, count):
+    """Memory allocated per object, as seen by tracemalloc (the list holding them excluded)."""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        objects = [make() for _ in range(count)]
+        used = tracemalloc.get_traced_memory()[0] - before - sys.getsizeof(objects)
+    finally:
+        tracemalloc.stop()
+    return used / count
+
+@pytest.fixture
+def events(perf_scale):
+    rng = np.random.default_rng(0)
+    count = int(200_000 * perf_scale)
+    return list(zip(rng.integers(0, 1000, count).tolist(), rng.integers(0, 300_000, count).tolist()))
+
+@pytest.mark.parametrize("name", FACTORIES)
+def test_construction_rate(name, perf, perf_scale):
+    make, count = FACTORIES[name], int(20_000 * perf_scale)
+    perf.rate(f"construct.{name}", lambda: [make() for _ in range(count)], count, "instances/s")
+
+@pytest.mark.parametrize("name", FACTORIES)
+def test_memory_per_instance(name, perf):
+    size = bytes_per_instance(FACTORIES[name], 10_000)
+    assert size > 0
+    perf.record(f"memory.{name}", size, "bytes/instance", higher_is_better=False)
+
+def test_fleet_memory_per_vehicle(perf):
+    count = 10_000
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        fleet = Fleet(capacity=count)
+        fleet.extend(["BYD"] * count, ["spa"] * count, [2025] * count, 0, [40] * count)
+        used = tracemalloc.get_traced_memory()[0] - before
+    finally:
+        tracemalloc.stop()
+    perf.record("memory.Fleet", used / count, "bytes/vehicle", higher_is_better=False)
+
+@pytest.mark.parametrize("name", ["Car", "ElectricCar"])
+def test_update_throughput(name, perf, perf_scale):
+    car, count = FACTORIES[name](), int(100_000 * perf_scale)
+    mileages = range(count)
+
+    def run():
+        update = car.update_odemeter_reading
+        for mileage in mileages:
+            update(mileage)
+
+    perf.rate(f"update.{name}", run, count, "updates/s")
+    assert car.odemeter_reading == count - 1 - (40 if name == "ElectricCar" else 0)
+
+def test_describe_battery_throughput(perf, perf_scale):
+    sink = BufferedSink(io.StringIO())
+    battery, count = Battery(sink=sink), int(100_000 * perf_scale)
+
+    def run():
+        for _ in range(count):
+            battery.describe_battery()
+        sink.flush()
+
+    perf.rate("describe.Battery", run, count, "messages/s")
+
+@pytest.mark.parametrize("target", ["cars", "fleet"])
+def test_replay_throughput(target, events, perf):
+    def run():
+        if target == "fleet":
+            cars = Fleet(capacity=1000)
+            cars.extend(["BYD"] * 1000, ["spa"] * 1000, [2025] * 1000, 0, [40, -1] * 500)
+        else:
+            cars = [ElectricCar("BYD", "spa", 2025) if i % 2 == 0 else Car("BYD", "spa", 2025)
+                    for i in range(1000)]
+        replay(cars, events, sink=BufferedSink(None))
+
+    perf.rate(f"replay.{target}", run, len(events), "events/s", repeat=5)
@@ -0,0 +1,134 @@
+"""
+Options and fixtures for the benchmarks in car_benchmark_test.py.
+
+    pytest car_benchmark_test.py --perf-save perf_baseline.json      # record a baseline
+    pytest car_benchmark_test.py --perf-compare perf_baseline.json   # fail on regressions
+
+Without these options the benchmarks only run (as a smoke test) and never fail on timing.
+
+The speed of a shared or frequency-scaled machine drifts by more than the regressions
+worth catching, so rates are compared relative to a fixed calibration loop (see Perf.rate).
+Memory is compared as measured.
+"""
+import gc
+import json
+import platform
+import statistics
+import time
+from pathlib import Path
+
+import pytest
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup('perf', 'car.py benchmarks')
+    group.addoption('--perf-save', metavar='PATH',
+                    help="write the benchmark results to a baseline JSON file")
+    group.addoption('--perf-compare', metavar='PATH',
+                    help="fail benchmarks that regressed against this baseline JSON file")
+    group.addoption('--perf-threshold', type=float, default=0.25,
+                    help="allowed regression as a fraction of the baseline (default 0.25)")
+    group.addoption('--perf-scale', type=float, default=1.0,
+                    help="multiply the benchmark sizes, for longer and steadier runs")
+
+
+class _Target:
+    pass
+
+
+def calibration_time(count=200_000):
+    """Seconds for a fixed loop of attribute stores: how fast this machine runs Python right now."""
+    target = _Target()
+    start = time.perf_counter()
+    for i in range(count):
+        target.value = i
+    return time.perf_counter() - start
+
+
+def _load(path):
+    path = Path(path)
+    return json.loads(path.read_text()) if path.exists() else {'results': {}}
+
+
+class Perf:
+    """Measures benchmarks, records them for --perf-save and checks them for --perf-compare."""
+
+    def __init__(self, results, baseline, threshold):
+        self.results = results
+        self.baseline = baseline
+        self.threshold = threshold
+
+    def rate(self, name, run, count, unit, repeat=7):
+        """Time `run` (doing `count` operations) `repeat` times and record the median rate.
+
+        The calibration loop runs right after every repeat, and each rate is taken relative
+        to its own calibration, so a slower or faster moment hits both sides. The garbage
+        collector is off while timing, as in timeit. A result that looks like a regression is
+        measured once more, and the better of the two counts: noise rarely strikes twice.
+        """
+        rate, relative = self._measure(run, count, repeat)
+        base = self.baseline.get(name)
+        if base is not None and relative < base['relative'] * (1 - self.threshold):
+            rate, relative = max((rate, relative), self._measure(run, count, repeat), key=lambda r: r[1])
+        self.record(name, rate, unit, relative=relative)
+
+    def _measure(self, run, count, repeat):
+        rates, relative = [], []
+        for _ in range(repeat):
+            gc.collect()
+            gc.disable()
+            try:
+                start = time.perf_counter()
+                run()
+                rate = count / (time.perf_counter() - start)
+                relative.append(rate * calibration_time())
+            finally:
+                gc.enable()
+            rates.append(rate)
+        return statistics.median(rates), statistics.median(relative)
+
+    def record(self, name, value, unit, higher_is_better=True, relative=None):
+        """Record a result; fail when it is worse than the baseline beyond the threshold."""
+        self.results[name] = {'value': value, 'unit': unit, 'higher_is_better': higher_is_better}
+        if relative is not None:
+            self.results[name]['relative'] = relative
+        base = self.baseline.get(name)
+        if base is None:
+            return
+        current, baseline = (relative, base['relative']) if relative is not None else (value, base['value'])
+        change = current / baseline - 1
+        if higher_is_better and change < -self.threshold:
+            pytest.fail(f"{name}: {value:,.0f} {unit}, baseline {base['value']:,.0f}; "
+                        f"{-change:.0%} slower after calibration (threshold {self.threshold:.0%})")
+        if not higher_is_better and change > self.threshold:
+            pytest.fail(f"{name}: {value:,.1f} {unit}, baseline {base['value']:,.1f}; "
+                        f"{change:.0%} more (threshold {self.threshold:.0%})")
+
+
+@pytest.fixture(scope='session')
+def perf_results(request):
+    """All results of the session, written to --perf-save (merged into the file) at the end."""
+    results = {}
+    yield results
+    path = request.config.getoption('--perf-save')
+    if path and results:
+        baseline = _load(path)
+        baseline['machine'] = {'python': platform.python_version(), 'platform': platform.platform()}
+        baseline['results'].update(results)
+        Path(path).write_text(json.dumps(baseline, indent=2, sort_keys=True) + '\n')
+
+
+@pytest.fixture(scope='session')
+def perf_baseline(request):
+    path = request.config.getoption('--perf-compare')
+    return _load(path)['results'] if path else {}
+
+
+@pytest.fixture
+def perf_scale(request):
+    return request.config.getoption('--perf-scale')
+
+
+@pytest.fixture
+def perf(request, perf_results, perf_baseline):
+    return Perf(perf_results, perf_baseline, request.config.getoption('--perf-threshold'))
@@ -1,23 +1,14 @@
-from datetime import datetime
 from pathlib import Path
-import csv
 import matplotlib.pyplot as plt
 
+from weather_cache import load_cached
+
 path = Path('weather_data/sitka_weather_2021_simple.csv')
 
-lines = path.read_text().splitlines()
-reader = csv.reader(lines)
-header_row = next(reader)
-print(header_row)
+table = load_cached(path, columns=['DATE', 'TMAX', 'TMIN'])
+print(table.names)
 
-dates, highs, lows = [], [], []
-for row in reader:
-    current_date = datetime.strptime(row[2], '%Y-%m-%d')
-    dates.append(current_date)
-    high = int(row[4])
-    highs.append(high)
-    low = int(row[5])
-    lows.append(low)
+dates, highs, lows = table['DATE'], table['TMAX'], table['TMIN']
 
 # Plot the high temperatures.
 plt.style.use('seaborn-v0_8')
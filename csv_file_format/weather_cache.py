@@ -0,0 +1,103 @@
+"""
+Sidecar cache of parsed weather columns.
+
+Every parsed column (and mask) is saved as its own .npy file next to the source CSV, in
+.weather_cache/<file stem>-<path>-<version>-<columns>/, three short hashes: of the resolved
+path, of the file size and mtime, and of the selected columns. Editing or replacing the CSV
+changes the version, so the next load parses it again and deletes the entries of the old
+version; other column selections of the same version, and other files with the same stem,
+are left alone.
+
+On a hit the .npy files are opened with mmap_mode='r': nothing is parsed or copied, pages are
+read from disk only when a column is actually used.
+"""
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+from weather_loader import WeatherTable, load_weather
+
+CACHE_DIR_NAME = '.weather_cache'
+
+
+def _digest(*parts):
+    return hashlib.sha1('|'.join(parts).encode('utf-8')).hexdigest()[:8]
+
+
+def cache_key(path, columns=None):
+    """'<path>-<version>-<columns>' hashes: everything that decides whether a cached parse is still valid."""
+    path = Path(path).resolve()
+    stat = path.stat()
+    return '-'.join([_digest(str(path)), _digest(str(stat.st_size), str(stat.st_mtime_ns)),
+                     _digest(','.join(columns or ['*']))])
+
+
+def cache_entry(path, columns=None, cache_dir=None):
+    """Directory holding the cached columns of `path` for `columns`."""
+    path = Path(path)
+    cache_dir = Path(cache_dir) if cache_dir else path.parent / CACHE_DIR_NAME
+    return cache_dir / f"{path.stem}-{cache_key(path, columns)}"
+
+
+def write_table(table, entry):
+    """Save a WeatherTable as one .npy per column, replacing `entry` atomically."""
+    entry.parent.mkdir(parents=True, exist_ok=True)
+    tmp = Path(tempfile.mkdtemp(dir=entry.parent, prefix=f".{entry.name}-"))
+    try:
+        for i, name in enumerate(table.names):
+            np.save(tmp / f'col{i}.npy', table.columns[name])
+            if name in table.masks:
+                np.save(tmp / f'mask{i}.npy', table.masks[name])
+        meta = {'names': table.names, 'masked': [name in table.masks for name in table.names]}
+        (tmp / 'meta.json').write_text(json.dumps(meta))
+        os.replace(tmp, entry)
+    except OSError:
+        shutil.rmtree(tmp, ignore_errors=True)
+        if not entry.exists():
+            raise
+
+
+def read_table(entry):
+    """Open a cached entry with every column memory-mapped."""
+    meta = json.loads((entry / 'meta.json').read_text())
+    columns, masks = {}, {}
+    for i, (name, masked) in enumerate(zip(meta['names'], meta['masked'])):
+        columns[name] = np.load(entry / f'col{i}.npy', mmap_mode='r')
+        if masked:
+            masks[name] = np.load(entry / f'mask{i}.npy', mmap_mode='r')
+    return WeatherTable(columns, masks)
+
+
+def remove_stale(path, entry):
+    """Delete the cache entries of older versions of the same source file."""
+    path_key, version, _ = entry.name.rsplit('-', 3)[1:]
+    prefix = f"{Path(path).stem}-{path_key}-"
+    for old in entry.parent.glob(f"{prefix}*"):
+        if old.is_dir() and old.name[len(prefix):].split('-')[0] != version:
+            shutil.rmtree(old, ignore_errors=True)
+
+
+def load_cached(path, columns=None, cache_dir=None):
+    """Like load_weather(), but served from the mmap cache when the CSV is unchanged."""
+    entry = cache_entry(path, columns, cache_dir)
+    if (entry / 'meta.json').exists():
+        return read_table(entry)
+
+    table = load_weather(path, columns)
+    remove_stale(path, entry)
+    write_table(table, entry)
+    return read_table(entry)
+
+
+if __name__ == '__main__':
+    import time
+
+    for attempt in ('first', 'second'):
+        start = time.perf_counter()
+        table = load_cached('weather_data/sitka_weather_2021_full.csv')
+        print(f"{attempt} load: {(time.perf_counter() - start) * 1000:.2f} ms, {table}")
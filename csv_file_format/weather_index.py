@@ -0,0 +1,130 @@
+"""
+Precomputed index for windowed statistics over one temperature column.
+
+Built once in O(n log n), after which:
+- rolling mean/min/max over any number of days costs O(n) for the whole series
+- mean/min/max between two arbitrary dates costs O(1)
+
+Means come from prefix sums of the values and of the count of valid cells. Min and max come
+from a sparse table: row k holds the position of the min (or max) of every block of 2**k
+rows, and any range is covered by two overlapping blocks. Dates are turned into row numbers
+through a lookup array with one entry per calendar day, so gaps in the data are handled and
+no binary search is needed.
+"""
+import numpy as np
+
+DAY = np.timedelta64(1, 'D')
+
+
+def _sparse_table(values, better):
+    """2-D array: [k, i] is the index of the best value in values[i:i + 2**k]."""
+    n = len(values)
+    levels = max(1, int(n).bit_length())
+    table = np.empty((levels, n), dtype=np.int64)
+    table[0] = np.arange(n)
+    for k in range(1, levels):
+        half = 1 << (k - 1)
+        a, b = table[k - 1, :n - half], table[k - 1, half:]
+        table[k, :n - half] = np.where(better(values[b], values[a]), b, a)
+        table[k, n - half:] = table[k - 1, n - half:]  # padding, never read by a valid query
+    return table
+
+
+class TemperatureIndex:
+    """Rolling and date-range statistics over a sorted daily series."""
+
+    def __init__(self, dates, values):
+        order = np.argsort(dates, kind='stable')
+        self.dates = np.asarray(dates, dtype='datetime64[D]')[order]
+        mask = np.ma.getmaskarray(values)[order]
+        self.values = np.ma.getdata(values)[order].astype(np.float64)
+        self.values[mask] = np.nan
+
+        valid = ~mask
+        self._sums = np.concatenate([[0.0], np.cumsum(np.where(valid, self.values, 0.0))])
+        self._counts = np.concatenate([[0], np.cumsum(valid)])
+        self._min_values = np.where(valid, self.values, np.inf)
+        self._max_values = np.where(valid, self.values, -np.inf)
+        self._min_table = _sparse_table(self._min_values, np.less)
+        self._max_table = _sparse_table(self._max_values, np.greater)
+
+        # _first_row[d] = first row whose date is >= start + d days
+        self.start = self.dates[0]
+        span = int((self.dates[-1] - self.start) / DAY)
+        self._first_row = np.searchsorted(self.dates, self.start + np.arange(span + 2) * DAY)
+
+    @classmethod
+    def from_table(cls, table, column='TMAX'):
+        return cls(table['DATE'], table[column])
+
+    def __len__(self):
+        return len(self.values)
+
+    # Row ranges, half open [lo, hi), all vectorized.
+    def _mean(self, lo, hi):
+        counts = self._counts[hi] - self._counts[lo]
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return np.where(counts > 0, (self._sums[hi] - self._sums[lo]) / counts, np.nan)
+
+    def _best(self, table, values, better, lo, hi):
+        """Row of the best value in each [lo, hi); ties go to the earlier row."""
+        length = np.maximum(hi - lo, 1)
+        k = np.log2(length).astype(np.int64)
+        a = table[k, lo]
+        b = table[k, np.maximum(hi - (1 << k), lo)]
+        return np.where(better(values[b], values[a]), b, a)
+
+    def _rows(self, start, end):
+        """Rows covering the dates start..end inclusive."""
+        span = len(self._first_row) - 1
+        first = np.clip((np.datetime64(start, 'D') - self.start) // DAY, 0, span)
+        last = np.clip((np.datetime64(end, 'D') - self.start) // DAY + 1, 0, span)
+        lo, hi = self._first_row[first], self._first_row[last]
+        if hi <= lo:
+            raise ValueError(f"No data between {start} and {end}")
+        return lo, hi
+
+    def _windows(self, days):
+        """For each row, the rows whose date lies in the `days` days ending on that row."""
+        hi = np.arange(1, len(self) + 1)
+        lo = np.searchsorted(self.dates, self.dates - (days - 1) * DAY)
+        return lo, hi
+
+    def rolling_mean(self, days):
+        return self._mean(*self._windows(days))
+
+    def rolling_min(self, days):
+        rows = self._best(self._min_table, self._min_values, np.less, *self._windows(days))
+        return self.values[rows]
+
+    def rolling_max(self, days):
+        rows = self._best(self._max_table, self._max_values, np.greater, *self._windows(days))
+        return self.values[rows]
+
+    def range_mean(self, start, end):
+        """Mean of the valid values from `start` to `end` (inclusive dates)."""
+        return float(self._mean(*self._rows(start, end)))
+
+    def range_min(self, start, end):
+        """(date, value) of the lowest value from `start` to `end`."""
+        row = self._best(self._min_table, self._min_values, np.less, *self._rows(start, end))
+        return self.dates[row], self.values[row]
+
+    def range_max(self, start, end):
+        """(date, value) of the highest value from `start` to `end`."""
+        row = self._best(self._max_table, self._max_values, np.greater, *self._rows(start, end))
+        return self.dates[row], self.values[row]
+
+    hottest = range_max
+    coldest = range_min
+
+
+if __name__ == '__main__':
+    from weather_loader import load_weather
+
+    table = load_weather('weather_data/death_valley_2021_simple.csv', ['DATE', 'TMAX', 'TMIN'])
+    highs = TemperatureIndex.from_table(table, 'TMAX')
+    print("7 day rolling mean:", np.round(highs.rolling_mean(7)[:10], 1))
+    print("30 day rolling max:", highs.rolling_max(30)[:10])
+    print("Hottest day in July:", highs.hottest('2021-07-01', '2021-07-31'))
+    print("Mean high in August:", round(highs.range_mean('2021-08-01', '2021-08-31'), 1))
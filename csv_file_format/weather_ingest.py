@@ -0,0 +1,116 @@
+"""
+Batch ingestion of many station files at once.
+
+Each worker process parses one CSV and writes its columns to the .npy cache from
+weather_cache.py. Only the path of the cache entry travels back to the parent, never the
+parsed rows, and the parent memory-maps the entries and merges them into one table keyed by
+STATION and DATE: one row per key, sorted. Unchanged files are cache hits, so re-running an
+ingestion only parses what changed.
+
+When several files have a row for the same station and day (a full and a simple export, a
+monthly file inside a yearly one), every cell comes from the last file, in path order, that
+has a value for it: a missing or masked cell never overwrites a measurement.
+"""
+import glob
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+
+from weather_cache import cache_entry, load_cached, read_table
+from weather_loader import WeatherTable
+
+KEY_COLUMNS = ['STATION', 'DATE']
+
+
+def find_station_files(source):
+    """Expand a directory (all *.csv inside) or a glob pattern into a sorted list of paths."""
+    source = str(source)
+    if os.path.isdir(source):
+        return sorted(Path(source).glob('*.csv'))
+    return sorted(Path(path) for path in glob.glob(source))
+
+
+def _parse_to_cache(path, columns, cache_dir):
+    """Worker: make sure the cache entry for `path` exists and return where it is."""
+    load_cached(path, columns, cache_dir)
+    return str(cache_entry(path, columns, cache_dir))
+
+
+def merge_tables(tables):
+    """Merge tables (union of columns) into one row per (STATION, DATE), sorted by both.
+
+    Rows sharing a key are combined cell by cell: the value from the last table that has the
+    cell unmasked wins; the cell is masked only when no table has it.
+    """
+    names, dtypes = [], {}
+    for table in tables:
+        for name in table.names:
+            if name not in dtypes:
+                names.append(name)
+                dtypes[name] = table.columns[name].dtype
+
+    columns, masks = {}, {}
+    for name in names:
+        parts, part_masks = [], []
+        for table in tables:
+            rows = len(table)
+            if name in table.columns:
+                parts.append(table.columns[name])
+                part_masks.append(table.masks[name] if name in table.masks else np.zeros(rows, bool))
+            else:
+                parts.append(np.zeros(rows, dtypes[name]))
+                part_masks.append(np.ones(rows, bool))
+        columns[name] = np.concatenate(parts)
+        mask = np.concatenate(part_masks)
+        if mask.any():
+            masks[name] = mask
+
+    # lexsort is stable: within a key, rows stay in table order.
+    order = np.lexsort((columns['DATE'], columns['STATION']))
+    stations, dates = columns['STATION'][order], columns['DATE'][order]
+    rows = len(order)
+    new_key = np.ones(rows, bool)
+    new_key[1:] = (stations[1:] != stations[:-1]) | (dates[1:] != dates[:-1])
+    starts = np.flatnonzero(new_key)
+    last = np.append(starts[1:], rows) - 1  # last row of every key
+
+    merged, merged_masks = {}, {}
+    for name, values in columns.items():
+        values = values[order]
+        if name not in masks:
+            merged[name] = values[last]
+            continue
+        mask = masks[name][order]
+        if not len(starts):
+            merged[name], merged_masks[name] = values, mask
+            continue
+        # Position of the last unmasked cell of every key, -1 when there is none.
+        latest = np.maximum.reduceat(np.where(mask, -1, np.arange(rows)), starts)
+        missing = latest < 0
+        merged[name] = values[np.where(missing, last, latest)]
+        if missing.any():
+            merged_masks[name] = missing
+    return WeatherTable(merged, merged_masks)
+
+
+def ingest(source, columns=None, workers=None, cache_dir=None):
+    """Parse every station file in `source` across a process pool and merge the results."""
+    paths = find_station_files(source)
+    if not paths:
+        raise FileNotFoundError(f"No station files found for {source}")
+    if columns is not None:
+        columns = KEY_COLUMNS + [name for name in columns if name not in KEY_COLUMNS]
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        entries = list(executor.map(
+            _parse_to_cache, paths, [columns] * len(paths), [cache_dir] * len(paths)
+        ))
+    return merge_tables([read_table(Path(entry)) for entry in entries])
+
+
+if __name__ == '__main__':
+    table = ingest('weather_data/*_simple.csv', ['TMAX', 'TMIN'])
+    print(table)
+    print(np.unique(table['STATION'], return_counts=True))
@@ -0,0 +1,142 @@
+"""
+Columnar loader for the NOAA weather exports in weather_data/.
+
+Instead of calling datetime.strptime() and int() once per row, the file is split into rows once
+(csv.reader runs in C), transposed into columns, and every column is converted in a single
+NumPy call:
+- DATE becomes datetime64[D]
+- temperatures (TMAX, TMIN, TAVG, TOBS) become int16
+- measurements such as PRCP, SNOW or AWND become float32
+- everything else (STATION, NAME, ...) stays a string column
+
+Empty cells (TAVG is empty for every Sitka row) are recorded in a boolean mask per column.
+
+Columns are found by header name, never by position: the simple, full and Death Valley
+exports all put TMAX/TMIN at different indices. Only the requested columns are kept and
+converted, so loading DATE/TMAX/TMIN from the 19 column _full files skips most of the work.
+"""
+import csv
+from operator import itemgetter
+from pathlib import Path
+
+import numpy as np
+
+DATE_TYPE = 'datetime64[D]'
+COLUMN_TYPES = {
+    'DATE': DATE_TYPE,
+    'TMAX': np.int16,
+    'TMIN': np.int16,
+    'TAVG': np.int16,
+    'TOBS': np.int16,
+    'PRCP': np.float32,
+    'SNOW': np.float32,
+    'SNWD': np.float32,
+    'AWND': np.float32,
+    'WSF2': np.float32,
+    'WSF5': np.float32,
+}
+
+
+class Schema:
+    """Maps requested column names to their positions in a header row."""
+
+    def __init__(self, header, names=None):
+        self.header = list(header)
+        self.names = self.header if names is None else list(names)
+        missing = [name for name in self.names if name not in self.header]
+        if missing:
+            raise ValueError(f"Columns {missing} not found in header {self.header}")
+        self.indices = [self.header.index(name) for name in self.names]
+        if len(self.indices) == 1:
+            index = self.indices[0]
+            self.project = lambda row: (row[index],)
+        else:
+            self.project = itemgetter(*self.indices)  # row -> tuple of the requested cells
+
+    def __repr__(self):
+        return f"Schema({dict(zip(self.names, self.indices))})"
+
+
+class WeatherTable:
+    """Typed columns of one weather file, keyed by header name."""
+
+    def __init__(self, columns, masks=None):
+        self.columns = columns  # name -> ndarray, missing cells hold 0 / NaT / ''
+        self.masks = masks or {}  # name -> bool ndarray, only for columns with empty cells
+
+    def __len__(self):
+        if not self.columns:
+            return 0
+        return len(next(iter(self.columns.values())))
+
+    def __contains__(self, name):
+        return name in self.columns
+
+    def __getitem__(self, name):
+        """Return a column; columns with empty cells come back as a masked array."""
+        values = self.columns[name]
+        if name in self.masks:
+            return np.ma.masked_array(values, mask=self.masks[name])
+        return values
+
+    @property
+    def names(self):
+        return list(self.columns)
+
+    def __repr__(self):
+        return f"WeatherTable(rows={len(self)}, columns={self.names})"
+
+
+def convert_column(name, values):
+    """Convert a sequence of raw cell strings into (ndarray, mask or None)."""
+    raw = np.array(values, dtype=str)
+    dtype = COLUMN_TYPES.get(name)
+    if dtype is None:
+        return raw, None
+
+    mask = raw == ''
+    if not mask.any():
+        mask = None
+    elif dtype == DATE_TYPE:
+        raw[mask] = 'NaT'
+    else:
+        raw[mask] = '0'
+
+    if dtype == DATE_TYPE:
+        return raw.astype(DATE_TYPE), mask
+    return raw.astype(dtype), mask
+
+
+def table_from_rows(names, rows):
+    """Build a WeatherTable from column names and a list of already projected rows."""
+    columns, masks = {}, {}
+    cells = list(zip(*rows)) if rows else [() for _ in names]
+    for name, values in zip(names, cells):
+        columns[name], mask = convert_column(name, values)
+        if mask is not None:
+            masks[name] = mask
+    return WeatherTable(columns, masks)
+
+
+def read_schema(path, columns=None):
+    """Read only the header row of a weather CSV and resolve `columns` against it."""
+    with open(Path(path), newline='', encoding='utf-8') as infile:
+        return Schema(next(csv.reader(infile)), columns)
+
+
+def load_weather(path, columns=None):
+    """Parse a NOAA weather CSV into a WeatherTable, keeping only `columns` (default: all)."""
+    with open(Path(path), newline='', encoding='utf-8') as infile:
+        reader = csv.reader(infile)
+        schema = Schema(next(reader), columns)
+        rows = list(map(schema.project, reader))
+    return table_from_rows(schema.names, rows)
+
+
+if __name__ == '__main__':
+    table = load_weather('weather_data/sitka_weather_2021_simple.csv')
+    print(table)
+    print(table['DATE'][:3], table['TMAX'][:3], table['TAVG'][:3])
+
+    print(read_schema('weather_data/death_valley_2021_simple.csv', ['DATE', 'TMAX', 'TMIN']))
+    print(load_weather('weather_data/sitka_weather_2021_full.csv', ['DATE', 'TMAX', 'TMIN', 'PRCP']))
@@ -0,0 +1,153 @@
+import os
+from pathlib import Path
+
+import numpy as np
+import pytest
+import weather_cache
+from weather_cache import load_cached
+from weather_index import TemperatureIndex
+from weather_ingest import ingest
+from weather_loader import load_weather
+from weather_plot import envelope, minmax_decimate, plot_temperatures, synthetic_table
+from weather_stream import iter_batches, summarize
+
+WEATHER_DATA = Path(__file__).parent / 'weather_data'
+
+
+@pytest.fixture
+def sitka_table():
+    return load_weather(WEATHER_DATA / 'sitka_weather_2021_simple.csv')
+
+def test_column_types(sitka_table):
+    assert sitka_table['DATE'].dtype == np.dtype('datetime64[D]')
+    assert sitka_table.columns['TMAX'].dtype == np.int16
+    assert sitka_table['DATE'][0] == np.datetime64('2021-01-01')
+    assert sitka_table['TMAX'][0] == 44
+
+def test_empty_tavg_is_masked(sitka_table):
+    assert len(sitka_table) == 364
+    assert sitka_table['TAVG'].mask.all()
+
+def test_columns_resolved_by_header_name():
+    table = load_weather(WEATHER_DATA / 'death_valley_2021_simple.csv', ['DATE', 'TMIN', 'TMAX'])
+    assert table.names == ['DATE', 'TMIN', 'TMAX']
+    assert table['TMAX'][0] == 71
+    assert table['TMIN'][0] == 51
+
+def test_unknown_column_raises():
+    with pytest.raises(ValueError):
+        load_weather(WEATHER_DATA / 'death_valley_2021_simple.csv', ['DATE', 'TAVG'])
+
+def test_stream_batches_match_full_load():
+    path = WEATHER_DATA / 'sitka_weather_2021_full.csv'
+    batches = list(iter_batches(path, ['DATE', 'TMAX'], batch_size=100, chunk_size=37))
+    assert [len(batch) for batch in batches] == [100, 100, 100, 65]
+    table = load_weather(path, ['DATE', 'TMAX'])
+    assert (np.concatenate([batch.columns['DATE'] for batch in batches]) == table['DATE']).all()
+
+def test_monthly_summary_skips_missing_cells():
+    january = summarize(WEATHER_DATA / 'sitka_weather_2021_simple.csv', batch_size=7)[np.datetime64('2021-01')]
+    low, high, mean = january['TMAX']
+    assert (low, high) == (30, 48)
+
+def test_cache_is_memory_mapped_and_invalidated(tmp_path):
+    path = tmp_path / 'station.csv'
+    path.write_text((WEATHER_DATA / 'sitka_weather_07-2021_simple.csv').read_text())
+    cache_dir = tmp_path / 'cache'
+
+    table = load_cached(path, ['DATE', 'TAVG', 'TMAX'], cache_dir)
+    assert isinstance(table.columns['DATE'], np.memmap)
+    assert table['TAVG'].mask.all()
+    assert table['TMAX'][0] == 61
+
+    mtime = path.stat().st_mtime_ns
+    path.write_text(path.read_text().replace('"2021-07-01",,"61"', '"2021-07-01",,"99"'))
+    os.utime(path, ns=(mtime + 10**9, mtime + 10**9))
+    table = load_cached(path, ['DATE', 'TAVG', 'TMAX'], cache_dir)
+    assert table['TMAX'][0] == 99
+    assert len(list(cache_dir.iterdir())) == 1
+
+def test_cache_keeps_other_column_selections_and_files(tmp_path, monkeypatch):
+    parses = []
+    monkeypatch.setattr(weather_cache, 'load_weather', lambda *args: parses.append(args) or load_weather(*args))
+    path = tmp_path / 'station.csv'
+    path.write_text((WEATHER_DATA / 'sitka_weather_07-2021_simple.csv').read_text())
+    other = tmp_path / 'other' / 'station.csv'  # same stem, different file
+    other.parent.mkdir()
+    other.write_text(path.read_text())
+    cache_dir = tmp_path / 'cache'
+
+    for _ in range(3):
+        load_cached(path, ['DATE', 'TMAX'], cache_dir)
+        load_cached(path, cache_dir=cache_dir)
+        load_cached(other, cache_dir=cache_dir)
+    assert len(parses) == 3
+    assert len(list(cache_dir.iterdir())) == 3
+
+def test_ingest_merges_stations_sorted_by_station_and_date(tmp_path):
+    pattern = str(WEATHER_DATA / '*_2021_simple.csv')
+    table = ingest(pattern, ['TMAX'], workers=2, cache_dir=tmp_path)
+    assert table.names == ['STATION', 'DATE', 'TMAX']
+    assert len(table) == 365 + 364
+    assert table['STATION'][0] == 'USC00042319'
+    assert (np.diff(table['DATE'][:365].astype(np.int64)) > 0).all()
+
+def test_ingest_keeps_one_row_per_station_and_day(tmp_path):
+    table = ingest(WEATHER_DATA, ['TMAX', 'TMIN'], workers=2, cache_dir=tmp_path)
+    keys = set(zip(table['STATION'].tolist(), table['DATE'].tolist()))
+    assert len(table) == len(keys) == 365 + 365
+
+    header = '"STATION","NAME","DATE","TMAX","TMIN"\n'
+    (tmp_path / 'a.csv').write_text(header + '"S1","X","2021-01-01","50","40"\n"S1","X","2021-01-02","51",\n')
+    (tmp_path / 'b.csv').write_text(header + '"S1","X","2021-01-01",,"42"\n"S1","X","2021-01-02","55",\n')
+    table = ingest(tmp_path / '*.csv', ['TMAX', 'TMIN'], workers=1, cache_dir=tmp_path / 'cache')
+    assert len(table) == 2
+    assert table['TMAX'].tolist() == [50, 55]  # b.csv wins, but its empty cell does not
+    assert table['TMIN'].tolist() == [42, None]
+
+def test_temperature_index_matches_brute_force():
+    table = load_weather(WEATHER_DATA / 'death_valley_2021_simple.csv', ['DATE', 'TMAX'])
+    index = TemperatureIndex.from_table(table, 'TMAX')
+    highs = table['TMAX']
+    assert np.allclose(index.rolling_mean(7)[6:], [highs[i - 6:i + 1].mean() for i in range(6, len(highs))])
+    assert index.rolling_max(30)[-1] == highs[-30:].max()
+
+    date, value = index.hottest('2021-07-01', '2021-07-31')
+    july = (table['DATE'] >= np.datetime64('2021-07-01')) & (table['DATE'] <= np.datetime64('2021-07-31'))
+    assert value == highs[july].max()
+    assert highs[table['DATE'] == date][0] == value
+
+def test_minmax_decimation_keeps_extremes_in_order():
+    rng = np.random.default_rng(0)
+    x = np.arange(100_000)
+    y = np.ma.masked_array(rng.normal(0, 10, x.size), mask=np.zeros(x.size, dtype=bool))
+    y[123] = 999
+    y.mask[123] = True  # a masked cell never reaches the plot
+    y[5000], y[77_777] = -500, 500
+    dx, dy = minmax_decimate(x, y, buckets=100)
+    assert len(dx) <= 200
+    assert (np.diff(dx) > 0).all()
+    assert dy.min() == -500 and dy.max() == 500
+    assert 123 not in dx
+
+    short_x, short_y = minmax_decimate(x[:10], y[120:130], buckets=100)
+    assert len(short_x) == 9 and 999 not in short_y
+
+def test_envelope_covers_every_bucket():
+    rng = np.random.default_rng(1)
+    x = np.arange(50_000)
+    high = rng.normal(60, 5, x.size)
+    low = np.ma.masked_array(high - 10, mask=x == 42)
+    bx, blow, bhigh = envelope(x, low, high, buckets=100)
+    assert len(bx) <= 100
+    assert (np.diff(bx) > 0).all()
+    assert blow.min() == np.ma.min(low) and bhigh.max() == high.max()
+    assert (blow <= bhigh).all()
+
+def test_plot_temperatures_writes_png_and_svg(tmp_path):
+    table = synthetic_table(years=2, per_day=4)
+    points = plot_temperatures(table, tmp_path / 'temps.png', width_px=300, height_px=200)
+    assert points <= 4 * 2 * 300
+    plot_temperatures(table, tmp_path / 'temps.svg', width_px=300, height_px=200)
+    assert (tmp_path / 'temps.png').read_bytes().startswith(b'\x89PNG')
+    assert b'<svg' in (tmp_path / 'temps.svg').read_bytes()[:1000]
@@ -0,0 +1,132 @@
+"""
+Fast, headless rendering of long temperature series.
+
+sitka_highs.py hands matplotlib lists of datetime objects with one point per day, which is
+fine for a year but very slow for decades of daily or hourly data. Here:
+- the typed columns from weather_loader are passed straight through (datetime64 dates)
+- each series is reduced to at most two points per horizontal pixel: the min and the max
+  of every pixel bucket, so peaks and troughs survive while the point count stays constant
+- figures are drawn with the Agg canvas, no GUI or pyplot state, and saved as PNG or SVG
+
+Run this file to benchmark the current approach against the fast path.
+"""
+import time
+from datetime import datetime
+
+import numpy as np
+from matplotlib import style
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+from weather_loader import WeatherTable
+
+WIDTH_PX, HEIGHT_PX, DPI = 1500, 900, 100
+
+
+def _buckets(n, buckets):
+    """Start index of each of `buckets` equal sized index ranges over n points."""
+    return np.unique(np.linspace(0, n, buckets + 1, dtype=np.int64)[:-1])
+
+
+def _valid(x, y):
+    """Drop masked cells, so decimation only sees real measurements."""
+    mask = np.ma.getmaskarray(y)
+    return np.asarray(x)[~mask], np.ma.getdata(y)[~mask]
+
+
+def minmax_decimate(x, y, buckets=WIDTH_PX):
+    """Keep only the min and max point of each bucket, in their original order."""
+    x, y = _valid(x, y)
+    n = len(y)
+    if n <= 2 * buckets:
+        return x, y
+
+    bucket_id = np.repeat(np.arange(buckets), np.diff(np.append(_buckets(n, buckets), n)))
+    order = np.lexsort((y, bucket_id))  # by bucket, then by value
+    starts = np.searchsorted(bucket_id[order], np.arange(buckets))
+    ends = np.append(starts[1:], n) - 1
+    keep = np.unique(np.concatenate([order[starts], order[ends]]))
+    return x[keep], y[keep]
+
+
+def envelope(x, low, high, buckets=WIDTH_PX):
+    """Per-bucket min of `low` and max of `high`, for fill_between at screen resolution."""
+    mask = np.ma.getmaskarray(low) | np.ma.getmaskarray(high)
+    x, low, high = np.asarray(x)[~mask], np.ma.getdata(low)[~mask], np.ma.getdata(high)[~mask]
+    if len(x) <= 2 * buckets:
+        return x, low, high
+    starts = _buckets(len(x), buckets)
+    return x[starts], np.minimum.reduceat(low, starts), np.maximum.reduceat(high, starts)
+
+
+def plot_temperatures(table, out_path, title="Daily High and Low Temperatures",
+                      width_px=WIDTH_PX, height_px=HEIGHT_PX, dpi=DPI):
+    """Render TMAX/TMIN of a WeatherTable to `out_path` (.png or .svg). Returns points drawn."""
+    dates = table['DATE']
+    highs_x, highs = minmax_decimate(dates, table['TMAX'], width_px)
+    lows_x, lows = minmax_decimate(dates, table['TMIN'], width_px)
+    band_x, band_low, band_high = envelope(dates, table['TMIN'], table['TMAX'], width_px)
+
+    with style.context('seaborn-v0_8'):
+        fig = Figure(figsize=(width_px / dpi, height_px / dpi), dpi=dpi)
+        FigureCanvasAgg(fig)
+        ax = fig.add_subplot()
+        ax.plot(highs_x, highs, color='red', alpha=0.5)
+        ax.plot(lows_x, lows, color='blue', alpha=0.5)
+        ax.fill_between(band_x, band_low, band_high, facecolor='blue', alpha=0.1)
+        ax.set_title(title, fontsize=24)
+        ax.set_xlabel('', fontsize=16)
+        fig.autofmt_xdate()
+        ax.set_ylabel("Temperature (F)", fontsize=16)
+        ax.tick_params(labelsize=16)
+        fig.savefig(out_path)
+    return len(highs) + len(lows) + 2 * len(band_x)
+
+
+def plot_temperatures_naive(dates, highs, lows, out_path, dpi=DPI):
+    """What sitka_highs.py does: Python lists of datetimes, every point drawn."""
+    with style.context('seaborn-v0_8'):
+        fig = Figure(figsize=(WIDTH_PX / dpi, HEIGHT_PX / dpi), dpi=dpi)
+        FigureCanvasAgg(fig)
+        ax = fig.add_subplot()
+        ax.plot(dates, highs, color='red', alpha=0.5)
+        ax.plot(dates, lows, color='blue', alpha=0.5)
+        ax.fill_between(dates, lows, highs, facecolor='blue', alpha=0.1)
+        fig.autofmt_xdate()
+        fig.savefig(out_path)
+    return 4 * len(dates)
+
+
+def synthetic_table(years=10, per_day=24, seed=0):
+    """An hourly-resolution table shaped like the weather files, for benchmarking."""
+    n = years * 365 * per_day
+    rng = np.random.default_rng(seed)
+    dates = np.datetime64('2010-01-01T00', 'h') + np.arange(n) * np.timedelta64(24 // per_day, 'h')
+    season = 20 * np.sin(np.arange(n) * 2 * np.pi / (365 * per_day))
+    highs = (55 + season + rng.normal(0, 5, n)).astype(np.int16)
+    lows = (highs - 10 - rng.integers(0, 8, n)).astype(np.int16)
+    return WeatherTable({'DATE': dates, 'TMAX': highs, 'TMIN': lows})
+
+
+def benchmark(table, out_dir='.'):
+    """Print points rendered and wall time of the current approach versus the fast path."""
+    start = time.perf_counter()
+    dates = [datetime.fromisoformat(str(d)) for d in table['DATE']]
+    highs, lows = table['TMAX'].tolist(), table['TMIN'].tolist()
+    naive_points = plot_temperatures_naive(dates, highs, lows, f'{out_dir}/naive.png')
+    naive_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    fast_points = plot_temperatures(table, f'{out_dir}/fast.png')
+    fast_time = time.perf_counter() - start
+
+    print(f"rows: {len(table)}")
+    print(f"naive: {naive_points:>9} points in {naive_time:.2f} s")
+    print(f"fast:  {fast_points:>9} points in {fast_time:.2f} s ({naive_time / fast_time:.1f}x)")
+
+
+if __name__ == '__main__':
+    import tempfile
+
+    with tempfile.TemporaryDirectory() as out_dir:
+        benchmark(synthetic_table(years=10, per_day=24), out_dir)
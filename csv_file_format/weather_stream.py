@@ -0,0 +1,108 @@
+"""
+Streaming reader for weather files that do not fit in memory.
+
+The file is read in fixed size byte chunks. A row cut in half at the end of a chunk is kept
+back and glued to the start of the next chunk, so only complete lines are handed to the csv
+module. Rows are collected into batches of `batch_size` and every batch is converted into a
+WeatherTable, so memory depends on the chunk and batch sizes, never on the file size.
+
+NOAA exports never put a newline inside a quoted cell, which is what makes splitting on
+b'\\n' safe here.
+"""
+import csv
+from pathlib import Path
+
+import numpy as np
+
+from weather_loader import Schema, table_from_rows
+
+CHUNK_SIZE = 1 << 20  # 1 MiB
+BATCH_SIZE = 10_000
+
+
+def iter_lines(path, chunk_size=CHUNK_SIZE):
+    """Yield decoded lines of a file, reading it `chunk_size` bytes at a time."""
+    with open(Path(path), 'rb') as infile:
+        tail = b''
+        while chunk := infile.read(chunk_size):
+            lines = (tail + chunk).split(b'\n')
+            tail = lines.pop()  # incomplete last row, finished by the next chunk
+            for line in lines:
+                yield line.decode('utf-8')
+        if tail:
+            yield tail.decode('utf-8')
+
+
+def iter_batches(path, columns=None, batch_size=BATCH_SIZE, chunk_size=CHUNK_SIZE):
+    """Yield WeatherTables of at most `batch_size` rows each."""
+    reader = csv.reader(iter_lines(path, chunk_size))
+    schema = Schema(next(reader), columns)
+    batch = []
+    for row in reader:
+        if not row:
+            continue
+        batch.append(schema.project(row))
+        if len(batch) == batch_size:
+            yield table_from_rows(schema.names, batch)
+            batch = []
+    if batch:
+        yield table_from_rows(schema.names, batch)
+
+
+class RunningStats:
+    """Min, max and mean of some columns per day or month, updated one batch at a time."""
+
+    def __init__(self, columns=('TMAX', 'TMIN'), period='M'):
+        self.columns = list(columns)
+        self.period = f'datetime64[{period}]'  # 'D' for daily, 'M' for monthly, 'Y' for yearly
+        self.groups = {}  # period -> {column: [min, max, sum, count]}
+
+    def update(self, table):
+        keys = table.columns['DATE'].astype(self.period)
+        for column in self.columns:
+            values = table.columns[column].astype(np.float64)
+            valid = ~table.masks[column] if column in table.masks else np.ones(len(values), bool)
+            periods, inverse = np.unique(keys[valid], return_inverse=True)
+            values = values[valid]
+
+            mins = np.full(len(periods), np.inf)
+            maxs = np.full(len(periods), -np.inf)
+            np.minimum.at(mins, inverse, values)
+            np.maximum.at(maxs, inverse, values)
+            sums = np.bincount(inverse, weights=values, minlength=len(periods))
+            counts = np.bincount(inverse, minlength=len(periods))
+
+            for i, key in enumerate(periods):
+                stats = self.groups.setdefault(key, {}).get(column)
+                if stats is None:
+                    self.groups[key][column] = [mins[i], maxs[i], sums[i], counts[i]]
+                else:
+                    stats[0] = min(stats[0], mins[i])
+                    stats[1] = max(stats[1], maxs[i])
+                    stats[2] += sums[i]
+                    stats[3] += counts[i]
+        return self
+
+    def result(self):
+        """Return {period: {column: (min, max, mean)}} in date order."""
+        return {
+            key: {
+                column: (low, high, total / count)
+                for column, (low, high, total, count) in self.groups[key].items()
+            }
+            for key in sorted(self.groups)
+        }
+
+
+def summarize(path, columns=('TMAX', 'TMIN'), period='M', batch_size=BATCH_SIZE):
+    """Stream a weather file and return its per-period min/max/mean."""
+    stats = RunningStats(columns, period)
+    for batch in iter_batches(path, ['DATE', *columns], batch_size):
+        stats.update(batch)
+    return stats.result()
+
+
+if __name__ == '__main__':
+    monthly = summarize('weather_data/sitka_weather_2021_full.csv', batch_size=50)
+    for month, values in monthly.items():
+        print(month, {column: tuple(round(float(v), 1) for v in stats) for column, stats in values.items()})
@@ -0,0 +1,255 @@
+"""
+Fleet: many Car / ElectricCar records in typed columns.
+
+A Car is a full Python object, and every ElectricCar also carries a Battery object, so
+a vehicle costs about 150 bytes (see benchmark()). A Fleet stores one row per vehicle
+instead:
+- make and model as codes into one shared table of interned strings (uint32 each)
+- year (int16), odometer (int64), battery_size (int32) and an electric flag, as NumPy
+  arrays that grow by doubling
+About 23 bytes per vehicle. fleet[i] hands out a small view that behaves like the Car or
+ElectricCar it stands for, update_odemeter_reading included. update_odometers() applies a
+whole vector of mileage updates, with the ElectricCar battery rule, in a few NumPy calls.
+"""
+import sys
+
+import numpy as np
+
+from car import Battery, ElectricCar
+
+DEFAULT_BATTERY_SIZE = Battery().battery_size
+COLUMNS = {
+    'make': np.uint32, 'model': np.uint32, 'year': np.int16,
+    'odometer': np.int64, 'battery_size': np.int32, 'electric': np.bool_,
+}
+
+
+class StringTable:
+    """Interned strings, each stored once and referred to by a small integer code."""
+
+    def __init__(self):
+        self.strings = []
+        self._codes = {}
+
+    def code(self, string):
+        code = self._codes.get(string)
+        if code is None:
+            code = self._codes[string] = len(self.strings)
+            self.strings.append(sys.intern(string))
+        return code
+
+    def __getitem__(self, code):
+        return self.strings[code]
+
+
+class BatteryView:
+    __slots__ = ('_fleet', '_id')
+
+    def __init__(self, fleet, vehicle_id):
+        self._fleet = fleet
+        self._id = vehicle_id
+
+    @property
+    def battery_size(self):
+        return int(self._fleet._columns['battery_size'][self._id])
+
+    @battery_size.setter
+    def battery_size(self, value):
+        self._fleet._columns['battery_size'][self._id] = value
+
+    @property
+    def sink(self):
+        return self._fleet.sink
+
+    description = Battery.description
+    describe_battery = Battery.describe_battery
+
+
+class CarView:
+    """One vehicle of a Fleet, with the attributes and methods of a Car."""
+    __slots__ = ('_fleet', 'id')
+
+    def __init__(self, fleet, vehicle_id):
+        self._fleet = fleet
+        self.id = vehicle_id
+
+    @property
+    def make(self):
+        return self._fleet.strings[self._fleet._columns['make'][self.id]]
+
+    @property
+    def model(self):
+        return self._fleet.strings[self._fleet._columns['model'][self.id]]
+
+    @property
+    def year(self):
+        return int(self._fleet._columns['year'][self.id])
+
+    @property
+    def odemeter_reading(self):
+        return int(self._fleet._columns['odometer'][self.id])
+
+    @odemeter_reading.setter
+    def odemeter_reading(self, mileage):
+        self._fleet._columns['odometer'][self.id] = mileage
+
+    def update_odemeter_reading(self, mileage):
+        self.odemeter_reading = mileage
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.make!r}, {self.model!r}, {self.year}, {self.odemeter_reading})"
+
+
+class ElectricCarView(CarView):
+    __slots__ = ()
+
+    @property
+    def battery(self):
+        return BatteryView(self._fleet, self.id)
+
+    update_odemeter_reading = ElectricCar.update_odemeter_reading
+
+
+class Fleet:
+    """Column store of vehicles; ids are row numbers, in the order vehicles were added."""
+
+    def __init__(self, capacity=1024, sink=print):
+        self.strings = StringTable()
+        self.sink = sink  # where the electric cars' battery messages go, as in Battery
+        self._columns = {name: np.zeros(capacity, dtype=dtype) for name, dtype in COLUMNS.items()}
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    def column(self, name):
+        """The live column (a view, not a copy) for the vehicles added so far."""
+        return self._columns[name][:self._size]
+
+    @property
+    def nbytes(self):
+        return sum(column.itemsize for column in self._columns.values()) * self._size
+
+    def _reserve(self, count):
+        needed = self._size + count
+        capacity = len(self._columns['odometer'])
+        if needed <= capacity:
+            return
+        capacity = max(needed, 2 * capacity)
+        for name, column in self._columns.items():
+            grown = np.zeros(capacity, dtype=column.dtype)
+            grown[:self._size] = column[:self._size]
+            self._columns[name] = grown
+
+    def add(self, make, model, year, odemeter_reading=0, battery_size=None):
+        """Add a vehicle (electric when battery_size is given) and return its id."""
+        self._reserve(1)
+        vehicle_id = self._size
+        row = (self.strings.code(make), self.strings.code(model), year, odemeter_reading,
+               battery_size or 0, battery_size is not None)
+        for column, value in zip(self._columns.values(), row):
+            column[vehicle_id] = value
+        self._size += 1
+        return vehicle_id
+
+    def add_car(self, car):
+        battery = getattr(car, 'battery', None)
+        return self.add(car.make, car.model, car.year, car.odemeter_reading,
+                        battery.battery_size if battery is not None else None)
+
+    def extend(self, makes, models, years, odometers=0, battery_sizes=None):
+        """Add many vehicles at once from equal length sequences; returns their ids.
+
+        battery_sizes: None for no electric cars, else a sequence with a size, or a value
+        below 0, for each vehicle (below 0 means not electric).
+        """
+        count = len(makes)
+        self._reserve(count)
+        start, end = self._size, self._size + count
+        code = self.strings.code
+        self._columns['make'][start:end] = [code(make) for make in makes]
+        self._columns['model'][start:end] = [code(model) for model in models]
+        self._columns['year'][start:end] = years
+        self._columns['odometer'][start:end] = odometers
+        if battery_sizes is None:
+            self._columns['battery_size'][start:end] = 0
+            self._columns['electric'][start:end] = False
+        else:
+            sizes = np.asarray(battery_sizes)
+            self._columns['electric'][start:end] = sizes >= 0
+            self._columns['battery_size'][start:end] = np.maximum(sizes, 0)
+        self._size = end
+        return np.arange(start, end)
+
+    def __getitem__(self, vehicle_id):
+        if not 0 <= vehicle_id < self._size:
+            raise IndexError(f"no vehicle {vehicle_id}")
+        view = ElectricCarView if self._columns['electric'][vehicle_id] else CarView
+        return view(self, vehicle_id)
+
+    def __iter__(self):
+        return (self[vehicle_id] for vehicle_id in range(self._size))
+
+    def update_odometers(self, vehicle_ids, mileages):
+        """Set many odometers at once, with the ElectricCar rule (subtract the battery size
+        when the mileage is larger). A vehicle listed twice ends with its last mileage, as if
+        the updates were applied in order. Unlike ElectricCar, nothing is printed."""
+        ids = np.asarray(vehicle_ids, dtype=np.int64)
+        mileages = np.asarray(mileages, dtype=np.int64)
+        if ids.size and (ids.min() < 0 or ids.max() >= self._size):
+            raise IndexError("vehicle id out of range")
+        if ids.size > 1 and np.bincount(ids).max() > 1:  # repeated ids: keep the last update
+            _, last = np.unique(ids[::-1], return_index=True)
+            keep = ids.size - 1 - last
+            ids, mileages = ids[keep], mileages[keep]
+        battery = self._columns['battery_size'][ids]
+        offset = self._columns['electric'][ids] & (mileages > battery)
+        self._columns['odometer'][ids] = np.where(offset, mileages - battery, mileages)
+
+
+def benchmark(size=1_000_000, seed=0):
+    """Car objects vs a Fleet: memory per vehicle and a full round of odometer updates."""
+    import contextlib
+    import io
+    import time
+    import tracemalloc
+
+    from car import Car
+
+    rng = np.random.default_rng(seed)
+    makes = [['BYD', 'Tesla', 'Toyota', 'Ford'][i] for i in rng.integers(0, 4, size)]
+    models = [f"m{i}" for i in rng.integers(0, 50, size)]
+    years = rng.integers(2000, 2026, size)
+    electric = rng.random(size) < 0.5
+    mileages = rng.integers(0, 200_000, size)
+    year_list, electric_list = years.tolist(), electric.tolist()
+
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    cars = [(ElectricCar if e else Car)(make, model, year)
+            for make, model, year, e in zip(makes, models, year_list, electric_list)]
+    object_bytes = tracemalloc.get_traced_memory()[0] - before
+    before = tracemalloc.get_traced_memory()[0]
+    fleet = Fleet(capacity=size)
+    fleet.extend(makes, models, years, 0, np.where(electric, DEFAULT_BATTERY_SIZE, -1))
+    fleet_bytes = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    print(f"{size:,} vehicles: objects {object_bytes / size:.0f} B/vehicle, "
+          f"Fleet {fleet_bytes / size:.0f} B/vehicle ({object_bytes / fleet_bytes:.1f}x less)")
+
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()) as out:
+        for car, mileage in zip(cars, mileages.tolist()):
+            car.update_odemeter_reading(mileage)
+    loop = time.perf_counter() - start
+    ids = rng.permutation(size)
+    start = time.perf_counter()
+    fleet.update_odometers(ids, mileages[ids])
+    bulk = time.perf_counter() - start
+    assert fleet.column('odometer').tolist() == [car.odemeter_reading for car in cars]
+    print(f"update every odometer: objects {loop:.2f}s ({len(out.getvalue()) / 1e6:.0f} MB of prints "
+          f"discarded), Fleet.update_odometers {bulk:.3f}s")
+
+
+if __name__ == '__main__':
+    benchmark()
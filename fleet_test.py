@@ -0,0 +1,37 @@
+import pytest
+from car import Car, ElectricCar
+from fleet import Fleet
+
+@pytest.fixture
+def fleet():
+    fleet = Fleet(capacity=2)
+    fleet.add_car(Car("BYD", "spa", 2025))
+    fleet.add_car(ElectricCar("Tesla", "3", 2024))
+    fleet.extend(["BYD", "Ford"], ["spa", "F-150"], [2020, 2019], 10, [60, -1])
+    return fleet
+
+def test_views_keep_the_car_api(fleet, capsys):
+    car, electric = fleet[0], fleet[1]
+    assert (car.make, car.model, car.year) == ("BYD", "spa", 2025)
+    assert fleet[2].odemeter_reading == 10 and fleet[2].battery.battery_size == 60
+    assert not hasattr(fleet[3], "battery")
+
+    car.update_odemeter_reading(100)
+    electric.update_odemeter_reading(100)
+    assert capsys.readouterr().out == "This battery has a 40 kwh battery.\n"
+    assert (car.odemeter_reading, electric.odemeter_reading) == (100, 60)
+    assert fleet.strings.strings == ["BYD", "spa", "Tesla", "3", "Ford", "F-150"]
+
+def test_bulk_updates_match_one_by_one_updates(fleet, capsys):
+    cars = [Car("BYD", "spa", 2025), ElectricCar("Tesla", "3", 2024),
+            ElectricCar("BYD", "spa", 2020), Car("Ford", "F-150", 2019)]
+    cars[2].battery.battery_size = 60
+    ids = [3, 1, 2, 0, 1, 2]
+    mileages = [500, 30, 70, 5, 45, 61]
+    for vehicle_id, mileage in zip(ids, mileages):
+        cars[vehicle_id].update_odemeter_reading(mileage)
+
+    fleet.update_odometers(ids, mileages)
+    assert fleet.column("odometer").tolist() == [car.odemeter_reading for car in cars]
+    with pytest.raises(IndexError):
+        fleet.update_odometers([4], [1])
@@ -1,3 +1,5 @@
+from student_table import StudentTable
+
 # lists
 for i in range(1, 5):
     print(i ** 2)
@@ -35,6 +37,14 @@ student_names = { student.name: student.gpa for student in students } # { 'A': 1
 
 # tuples
 student_gpas = tuple(student.gpa for student in students if student.major == 'cs') # (1)
+
+# Indexed queries: StudentTable keeps the students as columns with a sorted GPA index and a
+# major index, so these queries do not sort or scan the whole roster (see student_table.py)
+table = StudentTable(students)
+table.insert('D', 3.5, 'cs')
+print(table.query('cs', min_gpa=3))  # [Student('D', 3.5, 'cs')]
+print([student.name for student in table.by_gpa(2, 3)])  # ['B', 'C']
+print(table.top(2))  # [Student('D', 3.5, 'cs'), Student('C', 3.0, 'med')]
 """
 The *args syntax allows you to pass a variable number of non-keyword arguments to a function.
 Usage: When you prefix a parameter with an asterisk (*), it collects any extra positional arguments
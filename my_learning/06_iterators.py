@@ -9,6 +9,7 @@ Python has a built-in function called iter(). When you pass it a
 collection, you get back an iterator object. Python effectively does under the hood is call
 iter() on that collection.
 """
+from number_collection import NumberCollection
 
 numbers = [1, 2, 3, 4, 5]
 numbers_iter = iter(numbers)
@@ -36,40 +37,14 @@ for number in countdown:
     print(number)  # Output: 5, 4, 3, 2, 1
 """
 Reverse Iterate example
-Normal Iteration: The __iter__() method returns self, allowing iteration over the collection in the standard order.
-Reverse Iteration: The reverse_iter method returns a new ReverseIterator class, which allows for iterating through 
-the collection in reverse.
+Normal Iteration: The __iter__() method returns a new NumberIterator, allowing iteration over the collection in the
+standard order.
+Reverse Iteration: The reverse_iter method returns a NumberIterator that walks the indexes backwards, which allows for
+iterating through the collection in reverse.
 """
 
-class NumberCollection:
-    def __init__(self, numbers):
-        self.numbers = numbers
-
-    def __iter__(self):
-        return self  # Returning the object itself
-
-    def __next__(self):
-        if not self.numbers:
-            raise StopIteration
-        return self.numbers.pop(0)  # Return and remove the first element
-
-    def reverse_iter(self):
-        class ReverseIterator:
-            def __init__(self, collection): # collection is NumberCollection instance
-                self.index = len(collection.numbers) - 1
-                self.collection = collection
-
-            def __iter__(self):
-                return self
-
-            def __next__(self):
-                if self.index < 0:
-                    raise StopIteration
-                value = self.collection.numbers[self.index]
-                self.index -= 1
-                return value
-
-        return ReverseIterator(self)
+# NumberCollection keeps its numbers in an array and hands out a new index-based iterator
+# (NumberIterator) for every loop, so iterating does not empty it (see number_collection.py).
 
 # Usage
 collection = NumberCollection([1, 2, 3, 4, 5])
@@ -81,4 +56,9 @@ for number in collection:
 # Reverse iteration
 reverse_iterator = collection.reverse_iter()
 for number in reverse_iterator:
-    print(number)  # Output: 5, 4, 3, 2, 1
\ No newline at end of file
+    print(number)  # Output: 5, 4, 3, 2, 1
+
+# The collection is still full: iterate it again, one batch at a time.
+# Each batch is a memoryview of the array, not a copy.
+for batch in collection.iter_batches(2):
+    print(batch.tolist(), sum(batch))  # Output: [1, 2] 3, [3, 4] 7, [5] 5
@@ -10,6 +10,8 @@ than lists, especially for large datasets.
 3. Easy to Implement: Generators are simpler to create than custom iterator classes, as they use
 standard function syntax.
 """
+from pipeline import Pipeline
+
 
 def count_up_to(n):
     count = 1
@@ -39,4 +41,17 @@ for _ in range(5):  # Limiting output to 5 values
 squares = (x * x for x in range(1, 6))  # Generator expression for squares
 
 for square in squares:
-    print(square)  # Output: 1, 4, 9, 16, 25
\ No newline at end of file
+    print(square)  # Output: 1, 4, 9, 16, 25
+
+# Pipelines: chain lazy stages over any generator (see pipeline.py)
+# Adjacent map/filter stages run fused in one loop; take() stops the infinite source.
+evens_squared = Pipeline(infinite_sequence()).filter(lambda x: x % 2 == 0).map(lambda x: x * x)
+print(evens_squared.take(4).to_list())  # Output: [4, 16, 36, 64]
+
+# Sliding windows and batches
+print(Pipeline(count_up_to(5)).window(3).to_list())  # Output: [(1, 2, 3), (2, 3, 4), (3, 4, 5)]
+print(Pipeline(count_up_to(5)).batch(2).to_list())  # Output: [[1, 2], [3, 4], [5]]
+
+# tee: two independent pipelines over the same generator
+small, large = Pipeline(count_up_to(6)).tee()
+print(small.filter(lambda x: x <= 3).to_list(), large.filter(lambda x: x > 3).to_list())
@@ -1,6 +1,11 @@
 import os.path
 from pathlib import Path
-import json
+
+import word_count
+import word_sketch
+from json_store import JsonStore, write_json_atomic
+from line_index import LineIndex
+from pipeline import Pipeline
 
 path = Path('pi_digits.text')
 
@@ -24,59 +29,71 @@ print(f"Number of words: {num_words}")
 
 numbers = [2, 3, 4, 5, 6, 7, 8, 9]
 path_n = Path('numbers.json')
-contents_n = json.dumps({
-    'numbers': numbers
-})
-path_n.write_text(contents_n)
-
-print(f"Number in json: {json.loads(path_n.read_text())}")
+# JsonStore appends each change to numbers.json.log instead of rewriting the file, and
+# folds the log back into numbers.json with an atomic rename (see json_store.py).
+with JsonStore(path_n) as store:
+    store.set('numbers', numbers)
+    print(f"Number in json: {store.to_dict()}")
 
 # file exists?
 path_u = Path('username.json')
 if not path_u.exists():
-    path_u.touch() # create the file
+    write_json_atomic(path_u, {})  # create the file, never half written
 
 # check isFile
 if os.path.isfile('username.json'):
     print("Username file exists: username.json")
 else:
-    outfile = open('username.json', 'w')
-    outfile.write(json.dumps({}))
-    outfile.close()
+    write_json_atomic(path_u, {})
 
 # count word occurrence in a file
-def count_words(filename):
-    # try:
-    #     with open(filename, 'r', encoding='utf-8') as infile:
+# The file is counted in large binary chunks across a process pool (see word_count.py);
+# with `top`, only the k most frequent words are printed, picked with a heap.
+# With `approximate`, fixed-size sketches replace the exact dict (see word_sketch.py).
+def count_words(filename, top=None, approximate=False):
+    if approximate:
+        sketch = word_sketch.sketch_file(filename)
+        print(f"About {sketch.distinct_count()} distinct words out of {sketch.total}")
+        for key, count in sketch.heavy_hitters(top or 10):
+            print(f"{key}: ~{count}")
+        return sketch
 
     try:
-        infile = open(filename, 'r')
+        dict1 = word_count.count_words(filename)
     except IOError as e:
         print(f"Filname doesn't exist: {e}")
+        return {}
 
-    dict1 = dict()
-    for line in infile:
-        line = line.strip()
-        line = line.lower()
-        words = line.split(" ")
-        for word in words:
-            if word in dict1:
-                dict1[word] += 1
-            else:
-                dict1[word] = 1
-    for key in list(dict1.keys()):
-        print(f"{key}: {dict1[key]}")
+    if top is None:
+        for key in list(dict1.keys()):
+            print(f"{key}: {dict1[key]}")
+    else:
+        for key, count in word_count.top(dict1, top):
+            print(f"{key}: {count}")
 
     return dict1
 
-# Assigment expression
+# Pattern matching
 def matching_lines_from_file(path, pattern):
-    with open(path) as handle:
-        while (line := handle.readline()) != '':
+    # One compiled regex over the memory-mapped file instead of a Python call per line;
+    # the line offsets are kept in a .lineidx file next to it for the next search.
+    with LineIndex(path) as lines:
+        for number, line in lines.search(pattern):
             print(line)
 
 # generator
-def lines_from_file(path):
-    with open(path) as handle:
-        for line in handle:
-            yield line.rstrip('\n')
+def lines_from_file(path, start=0, stop=None, reverse=False):
+    if start == 0 and stop is None and not reverse:
+        with open(path) as handle:
+            for line in handle:
+                yield line.rstrip('\n')
+        return
+    # Random access: jump straight to the requested lines through the line index
+    with LineIndex(path) as lines:
+        selected = range(*slice(start, stop).indices(len(lines)))
+        for number in reversed(selected) if reverse else selected:
+            yield lines[number]
+
+# Lazy pipeline over the lines (see pipeline.py): lengths of the first three non-empty lines
+line_lengths = Pipeline(lines_from_file(path)).map(str.strip).filter().map(len).take(3)
+print(f"Line lengths: {line_lengths.to_list()}")
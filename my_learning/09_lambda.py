@@ -15,6 +15,10 @@ Characteristics of Lambda Functions
 """
 from functools import reduce
 
+import numpy as np
+
+import functional
+
 # A simple lambda function to add two numbers
 add = lambda x, y: x + y
 result = add(3, 5)  # Output: 8
@@ -55,9 +59,17 @@ print(total_with_initializer)  # Output: 20 (10 + 1 + 2 + 3 + 4)
 # convert list to dict
 list_of_tuples = [('a', 1), ('b', 2), ('c', 3)]
 # Using reduce to convert list of tuples to a dictionary
-result_dict = reduce(lambda acc, item: {**acc, item[0]: item[1]}, list_of_tuples, {})
+# {**acc, ...} copies the whole dict on every step (O(n²)); functional.fold spots the
+# pattern and fills one dict in place instead (see functional.py)
+result_dict = functional.fold(lambda acc, item: {**acc, item[0]: item[1]}, list_of_tuples, {})
 print(result_dict)  # Output: {'a': 1, 'b': 2, 'c': 3}
 
+# With vectorize=True the lambda is called once with the whole array instead of once per element
+values = np.arange(1, 7)
+print(functional.map(lambda x: x ** 2, values, vectorize=True))  # Output: [ 1  4  9 16 25 36]
+print(functional.filter(lambda x: x % 2 == 0, values, vectorize=True))  # Output: [2 4 6]
+print(functional.reduce(lambda x, y: x + y, values, 10))  # Output: 31
+
 # Immediately invoked function
 (lambda x: x**4)(3)
 
@@ -1,6 +1,8 @@
 import asyncio
 import aiohttp
-from bs4 import BeautifulSoup
+
+from crawler import Crawler, read_stream
+from title_extractor import HeadScanner, TitleStage, extract_title
 
 
 """
@@ -39,26 +41,31 @@ async def main():
 asyncio.run(main())
 
 # Web Scraping with Asynchronous Requests
-async def fetch(url):
+async def fetch(url, max_bytes=None):
     async with aiohttp.ClientSession() as session:
         async with session.get(url, ssl=False) as response:
-            return await response.text()
+            # Read in chunks, stop after max_bytes instead of buffering the whole page
+            return await read_stream(response, max_bytes)
 
 # Basic scrapper
+# One session for every URL, at most 20 requests in flight (4 per host),
+# results printed as soon as each one completes.
 async def scrapper(urls):
-    tasks = [fetch(url) for url in urls]
-    results = await asyncio.gather(*tasks)
-    for url, content in zip(urls, results):
-        print(f"Fetched {len(content)} characters from {url}")
+    async with Crawler(concurrency=20, per_host=4, timeout=10) as crawler:
+        async for result in crawler.crawl(urls):
+            if result.ok:
+                print(f"Fetched {len(result.body)} characters from {result.url}")
+            else:
+                print(f"Error fetching {result.url}: {result.error or result.status}")
 
 asyncio.run(scrapper(['https://example.com']))
 
 # More advanced scrapper
-async def fetch_page(session, url):
-    """Fetch a web page and return its content."""
+async def fetch_page(session, url, max_bytes=None, until=None):
+    """Fetch a web page and return its content, or only its start if `until` says so."""
     async with session.get(url, ssl=False) as response:
         if response.status == 200:
-            return await response.text()
+            return await read_stream(response, max_bytes, until)
         else:
             print(f"Error fetching {url}: {response.status}")
             return None
@@ -66,20 +73,31 @@ async def fetch_page(session, url):
 async def get_title(url):
     """Get the title of a web page."""
     async with aiohttp.ClientSession() as session:
-        html = await fetch_page(session, url)
+        # Only the <head> is downloaded: reading stops once the title has been seen
+        html = await fetch_page(session, url, max_bytes=256 * 1024, until=HeadScanner().feed)
         if html:
-            soup = BeautifulSoup(html, 'html.parser')
-            title = soup.title.string if soup.title else 'No title found'
-            return title
+            # Parse off the event loop; the fast path only scans the <head>
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(None, extract_title, html)
         return None
 
 async def advanced_scrapper(urls):
     """Main function to fetch titles from multiple URLs."""
-    tasks = [get_title(url) for url in urls]
-    results = await asyncio.gather(*tasks)
-
-    for url, title in zip(urls, results):
-        print(f"Title for {url}: {title}")
+    crawler = Crawler(concurrency=20, per_host=4, timeout=10,
+                      max_bytes=256 * 1024, until=lambda: HeadScanner().feed)
+    async with crawler, TitleStage() as titles:
+        pending = 0
+        async for result in crawler.crawl(urls):
+            if not result.ok:
+                print(f"Error fetching {result.url}: {result.error or result.status}")
+                continue
+            await titles.put(result.url, result.body)  # parsed in the thread pool
+            pending += 1
+
+        for _ in range(pending):
+            url, title = await titles.get()
+            print(f"Title for {url}: {title}")
+    print(crawler.stats)  # bytes read versus bytes the servers would have sent
 
 
 asyncio.run(advanced_scrapper([
@@ -0,0 +1,201 @@
+"""
+A small crawl engine for the scrapers in 15_async_programming.py.
+
+Opening a ClientSession per URL and gathering one task per URL works for five pages, but
+with thousands it runs out of sockets and file descriptors. The Crawler instead has:
+- one ClientSession, so connections are pooled and reused
+- a global limit and a per-host limit on requests in flight
+- a bounded work queue: URLs are pulled from the input only as workers free up
+- a timeout per request, not per crawl
+- results streamed back as they complete, with `async for`
+- an optional hook awaited right before each request, for pacing (see Frontier.wait_turn)
+- optionally, bodies read in chunks and cut short by a byte cap or a predicate (e.g. "the
+  <title> has been seen"), see read_stream()
+"""
+import asyncio
+import codecs
+import time
+from collections import defaultdict
+from urllib.parse import urlsplit
+
+import aiohttp
+
+
+class FetchStats:
+    """How many body bytes were read, out of how many the servers had to send."""
+
+    def __init__(self):
+        self.responses = 0
+        self.stopped_early = 0
+        self.bytes_read = 0
+        self.bytes_available = 0  # Content-Length, or bytes read when it is unknown
+
+    @property
+    def saved(self):
+        return self.bytes_available - self.bytes_read
+
+    def __repr__(self):
+        return (f"FetchStats(responses={self.responses}, stopped_early={self.stopped_early}, "
+                f"bytes_read={self.bytes_read}, bytes_available={self.bytes_available})")
+
+
+async def read_stream(response, max_bytes=None, until=None, chunk_size=16 * 1024, stats=None):
+    """
+    Read and decode a body chunk by chunk instead of buffering it whole.
+    Stops after `max_bytes`, or as soon as `until(chunk)` returns True. When a read stops
+    early, aiohttp closes the connection instead of draining the rest of the body.
+    An unknown charset is read as UTF-8.
+    """
+    try:
+        codec = codecs.lookup(response.charset or 'utf-8')
+    except LookupError:
+        codec = codecs.lookup('utf-8')
+    decoder = codec.incrementaldecoder(errors='replace')
+    parts, read, stopped = [], 0, False
+    async for chunk in response.content.iter_chunked(chunk_size):
+        if max_bytes is not None and read + len(chunk) >= max_bytes:
+            stopped = read + len(chunk) > max_bytes or not response.content.at_eof()
+            chunk = chunk[:max_bytes - read]
+        read += len(chunk)
+        parts.append(decoder.decode(chunk))
+        if stopped or (until is not None and until(chunk)):
+            stopped = stopped or not response.content.at_eof()
+            break
+    parts.append(decoder.decode(b'', final=True))
+
+    if stats is not None:
+        stats.responses += 1
+        stats.stopped_early += stopped
+        stats.bytes_read += read
+        stats.bytes_available += response.content_length if response.content_length is not None else read
+    return ''.join(parts)
+
+
+class CrawlResult:
+    """Outcome of fetching one URL: either a body or an error."""
+
+    def __init__(self, url, status=None, body=None, error=None, elapsed=0.0):
+        self.url = url
+        self.status = status
+        self.body = body
+        self.error = error
+        self.elapsed = elapsed
+
+    @property
+    def ok(self):
+        return self.error is None and self.status == 200
+
+    def __repr__(self):
+        outcome = self.error or self.status
+        return f"CrawlResult({self.url!r}, {outcome}, {self.elapsed:.2f}s)"
+
+
+async def _aiter(urls):
+    """Accept both plain and async iterables of URLs."""
+    if hasattr(urls, '__aiter__'):
+        async for url in urls:
+            yield url
+    else:
+        for url in urls:
+            yield url
+
+
+class Crawler:
+    """Fetch many URLs over one session with bounded concurrency."""
+
+    def __init__(self, concurrency=20, per_host=4, timeout=10, queue_size=None, ssl=False,
+                 max_bytes=None, until=None, before_fetch=None):
+        self.concurrency = concurrency
+        self.per_host = per_host
+        self.timeout = timeout
+        self.queue_size = queue_size or concurrency * 2
+        self.ssl = ssl
+        self.max_bytes = max_bytes
+        self.until = until  # factory of a fresh per-response predicate, e.g. lambda: HeadScanner().feed
+        self.before_fetch = before_fetch  # awaited with the URL right before its request, e.g. Frontier.wait_turn
+        self.stats = FetchStats()
+        self.session = None
+        self._hosts = defaultdict(lambda: asyncio.Semaphore(self.per_host))
+
+    async def __aenter__(self):
+        connector = aiohttp.TCPConnector(limit=self.concurrency, limit_per_host=self.per_host, ssl=self.ssl)
+        self.session = aiohttp.ClientSession(connector=connector)
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.session.close()
+
+    async def read(self, response):
+        """Read the body of a successful response, stopping early if configured to."""
+        until = self.until() if self.until else None
+        return await read_stream(response, self.max_bytes, until, stats=self.stats)
+
+    async def fetch(self, url):
+        """Fetch one URL, never raising: failures end up in CrawlResult.error."""
+        start = time.perf_counter()
+        async with self._hosts[urlsplit(url).netloc]:
+            try:
+                if self.before_fetch is not None:
+                    await self.before_fetch(url)
+                async with asyncio.timeout(self.timeout):
+                    async with self.session.get(url) as response:
+                        body = await self.read(response) if response.status == 200 else None
+                        return CrawlResult(url, response.status, body, elapsed=time.perf_counter() - start)
+            except Exception as e:  # mostly aiohttp.ClientError and TimeoutError, but a worker must not die
+                error = f"{type(e).__name__}: {e}" if str(e) else type(e).__name__
+                return CrawlResult(url, error=error, elapsed=time.perf_counter() - start)
+
+    async def crawl(self, urls):
+        """Yield a CrawlResult for every URL, in completion order."""
+        work = asyncio.Queue(maxsize=self.queue_size)
+        results = asyncio.Queue(maxsize=self.queue_size)
+        done = object()
+
+        async def produce():
+            try:
+                async for url in _aiter(urls):
+                    await work.put(url)  # blocks while the workers are behind
+            finally:
+                for _ in range(self.concurrency):
+                    await work.put(done)
+
+        async def work_loop():
+            try:
+                while (url := await work.get()) is not done:
+                    await results.put(await self.fetch(url))
+            finally:
+                if not asyncio.current_task().cancelling():  # else crawl() is not waiting anymore
+                    await results.put(done)
+
+        tasks = [asyncio.create_task(produce())]
+        tasks += [asyncio.create_task(work_loop()) for _ in range(self.concurrency)]
+        try:
+            finished = 0
+            while finished < self.concurrency:
+                result = await results.get()
+                if result is done:
+                    finished += 1
+                else:
+                    yield result
+            await tasks[0]  # surface errors raised by the URL source
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+
+async def crawl(urls, **options):
+    """Shortcut: `async for result in crawl(urls)` with a throwaway Crawler."""
+    async with Crawler(**options) as crawler:
+        async for result in crawler.crawl(urls):
+            yield result
+
+
+if __name__ == '__main__':
+    async def main():
+        urls = ['https://www.example.com', 'https://www.python.org', 'https://www.wikipedia.org']
+        async for result in crawl(urls, concurrency=5, per_host=2, timeout=10):
+            size = len(result.body) if result.body else 0
+            print(f"{result} {size} characters")
+
+    asyncio.run(main())
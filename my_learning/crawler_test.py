@@ -0,0 +1,95 @@
+import asyncio
+
+from aiohttp import web
+from crawler import Crawler
+from title_extractor import HeadScanner, extract_title
+
+
+async def run_against_stub(test, delay=0.0):
+    """Serve /page/<n> locally and run `test(base_url, stats)` against it."""
+    stats = {'in_flight': 0, 'max_in_flight': 0}
+
+    async def page(request):
+        stats['in_flight'] += 1
+        stats['max_in_flight'] = max(stats['max_in_flight'], stats['in_flight'])
+        try:
+            await asyncio.sleep(float(request.query.get('delay', delay)))
+            number = request.match_info['number']
+            padding = '<p>filler</p>' * int(request.query.get('padding', 0))
+            html = f"<html><head><title>Page {number}</title></head>{padding}</html>"
+            charset = request.query.get('charset', 'utf-8')
+            return web.Response(body=html.encode('utf-8'), headers={'Content-Type': f"text/html; charset={charset}"})
+        finally:
+            stats['in_flight'] -= 1
+
+    app = web.Application()
+    app.router.add_get('/page/{number}', page)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    try:
+        return await test(f"http://127.0.0.1:{port}", stats)
+    finally:
+        await runner.cleanup()
+
+def test_crawl_streams_every_url_within_the_per_host_limit():
+    async def test(base_url, stats):
+        urls = [f"{base_url}/page/{n}" for n in range(30)]
+        async with Crawler(concurrency=10, per_host=3) as crawler:
+            results = [result async for result in crawler.crawl(urls)]
+        assert sorted(result.url for result in results) == sorted(urls)
+        assert all(result.ok for result in results)
+        assert stats['max_in_flight'] <= 3
+
+    asyncio.run(run_against_stub(test, delay=0.01))
+
+def test_slow_request_times_out_without_stopping_the_crawl():
+    async def test(base_url, stats):
+        urls = [f"{base_url}/page/1?delay=1", f"{base_url}/page/2"]
+        async with Crawler(concurrency=2, timeout=0.2) as crawler:
+            results = {result.url: result async for result in crawler.crawl(urls)}
+        assert results[urls[0]].error == 'TimeoutError'
+        assert 'Page 2' in results[urls[1]].body
+
+    asyncio.run(run_against_stub(test))
+
+def test_unknown_charset_is_read_as_utf8_and_the_crawl_finishes():
+    async def test(base_url, stats):
+        urls = [f"{base_url}/page/1?charset=no-such-charset", f"{base_url}/page/2"]
+        async with Crawler(concurrency=2, max_bytes=1024) as crawler:
+            results = {result.url: result async for result in crawler.crawl(urls)}
+        assert 'Page 1' in results[urls[0]].body
+        assert 'Page 2' in results[urls[1]].body
+
+    asyncio.run(asyncio.wait_for(run_against_stub(test), 10))
+
+def test_unexpected_errors_become_results():
+    def broken(chunk):
+        raise RuntimeError("broken predicate")
+
+    async def test(base_url, stats):
+        urls = [f"{base_url}/page/{n}" for n in range(2)]
+        async with Crawler(concurrency=2, until=lambda: broken) as crawler:
+            results = [result async for result in crawler.crawl(urls)]
+        assert [result.error for result in results] == ['RuntimeError: broken predicate'] * 2
+
+    asyncio.run(asyncio.wait_for(run_against_stub(test), 10))
+
+def test_streaming_reads_stop_at_title_or_byte_cap():
+    async def test(base_url, stats):
+        urls = [f"{base_url}/page/{n}?padding=20000" for n in range(3)]
+        async with Crawler(concurrency=3, until=lambda: HeadScanner().feed) as crawler:
+            results = [result async for result in crawler.crawl(urls)]
+        assert sorted(extract_title(result.body) for result in results) == ['Page 0', 'Page 1', 'Page 2']
+        assert crawler.stats.stopped_early == 3
+        assert crawler.stats.bytes_read < crawler.stats.bytes_available / 10
+
+        async with Crawler(max_bytes=1000) as crawler:
+            results = [result async for result in crawler.crawl(urls[:1])]
+        assert len(results[0].body) == 1000
+        assert (crawler.stats.bytes_read, crawler.stats.stopped_early) == (1000, 1)
+        assert crawler.stats.bytes_available > 260000
+
+    asyncio.run(run_against_stub(test))
@@ -0,0 +1,266 @@
+"""
+A crawl frontier that survives restarts.
+
+advanced_scrapper() keeps its URL list in memory; if the process dies, the crawl starts over.
+The Frontier keeps its state in a directory:
+- seen.bloom: a Bloom filter of every URL ever queued, memory-mapped, so millions of URLs
+  cost a few MB of page cache (at the price of a small false positive rate)
+- frontier.log: an append-only log, "+ url" when a URL is queued, "- url" when it is done;
+  replaying it gives back the pending URLs, and checkpoint() compacts it
+
+URLs are handed out politely: at most one URL per host every `delay` seconds, taking the
+host that has been waiting longest, so other hosts keep the crawl busy meanwhile. A crawler
+may still hold several handed out URLs of one host in its queue, so the same pacing is applied
+again when they are fetched: wait_turn() is the hook the Crawler awaits before every request.
+"""
+import asyncio
+import hashlib
+import heapq
+import math
+import mmap
+import os
+import struct
+import time
+from collections import deque
+from pathlib import Path
+from urllib.parse import urldefrag, urlsplit
+
+BLOOM_HEADER = struct.Struct('<QQQ')  # bits, hashes, items
+
+
+class BloomFilter:
+    """Fixed size set of hashes in a memory-mapped file; no false negatives."""
+
+    def __init__(self, path, capacity=1_000_000, error_rate=0.001):
+        self.path = Path(path)
+        if not self.path.exists():
+            bits = math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)
+            bits = (bits + 7) // 8 * 8
+            hashes = max(1, round(bits / capacity * math.log(2)))
+            with open(self.path, 'wb') as outfile:
+                outfile.write(BLOOM_HEADER.pack(bits, hashes, 0))
+                outfile.truncate(BLOOM_HEADER.size + bits // 8)
+        self._file = open(self.path, 'r+b')
+        self._map = mmap.mmap(self._file.fileno(), 0)
+        self.bits, self.hashes, self.count = BLOOM_HEADER.unpack_from(self._map, 0)
+
+    def _positions(self, item):
+        digest = hashlib.blake2b(item.encode('utf-8'), digest_size=16).digest()
+        h1, h2 = struct.unpack('<QQ', digest)
+        return [(h1 + i * h2) % self.bits for i in range(self.hashes)]
+
+    def __contains__(self, item):
+        offset = BLOOM_HEADER.size
+        return all(self._map[offset + bit // 8] & (1 << (bit % 8)) for bit in self._positions(item))
+
+    def add(self, item):
+        """Add an item; returns False if it was (probably) already there."""
+        offset = BLOOM_HEADER.size
+        new = False
+        for bit in self._positions(item):
+            byte = offset + bit // 8
+            mask = 1 << (bit % 8)
+            if not self._map[byte] & mask:
+                self._map[byte] |= mask
+                new = True
+        if new:
+            self.count += 1
+        return new
+
+    def flush(self):
+        BLOOM_HEADER.pack_into(self._map, 0, self.bits, self.hashes, self.count)
+        self._map.flush()
+
+    def close(self):
+        self.flush()
+        self._map.close()
+        self._file.close()
+
+
+def normalize(url):
+    """Drop the #fragment: it names the same document."""
+    return urldefrag(url.strip())[0]
+
+
+class Frontier:
+    """Deduplicated, persistent, per-host polite queue of URLs to crawl."""
+
+    def __init__(self, directory, delay=1.0, capacity=1_000_000, error_rate=0.001):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.delay = delay
+        self.seen = BloomFilter(self.directory / 'seen.bloom', capacity, error_rate)
+        self.log_path = self.directory / 'frontier.log'
+        self._hosts = {}  # host -> deque of pending URLs
+        self._ready = []  # heap of (time the host may be hit again, host)
+        self._next_allowed = {}
+        self._next_fetch = {}  # host -> earliest time of its next request, see wait_turn()
+        self._log_lines = 0
+        self.pending = 0
+        self.in_flight = set()
+        self._replay()
+        self._log = open(self.log_path, 'a', encoding='utf-8')
+
+    def _replay(self):
+        """Rebuild the pending queue from the log; a torn last line is ignored.
+
+        Pending URLs go back into the Bloom filter too, in case the process died between
+        logging a URL and setting its bits.
+        """
+        if not self.log_path.exists():
+            return
+        pending = {}
+        with open(self.log_path, encoding='utf-8') as infile:
+            for line in infile:
+                if not line.endswith('\n'):
+                    break
+                self._log_lines += 1
+                op, url = line[0], line[2:-1]
+                if op == '+':
+                    pending[url] = None
+                else:
+                    pending.pop(url, None)
+        for url in pending:
+            self.seen.add(url)
+            self._push(url)
+
+    def _push(self, url):
+        host = urlsplit(url).netloc
+        queue = self._hosts.get(host)
+        if queue is None:
+            queue = self._hosts[host] = deque()
+            heapq.heappush(self._ready, (self._next_allowed.get(host, 0.0), host))
+        queue.append(url)
+        self.pending += 1
+
+    def add(self, url):
+        """Queue a URL unless it was seen before. Returns True if it was queued."""
+        url = normalize(url)
+        if url in self.seen:
+            return False
+        # Log first: the Bloom bits reach the file through the mmap at once, so a URL marked
+        # seen but still sitting in the log's buffer would be lost in a crash.
+        self._log.write(f"+ {url}\n")
+        self._log.flush()
+        self.seen.add(url)
+        self._log_lines += 1
+        self._push(url)
+        return True
+
+    def add_many(self, urls):
+        return sum(self.add(url) for url in urls)
+
+    def pop(self, now=None):
+        """Next URL whose host may be hit now, or (None, seconds to wait)."""
+        now = time.monotonic() if now is None else now
+        if not self._ready:
+            return None, None
+        ready_at, host = self._ready[0]
+        if ready_at > now:
+            return None, ready_at - now
+        heapq.heappop(self._ready)
+        queue = self._hosts[host]
+        url = queue.popleft()
+        self.pending -= 1
+        self._next_allowed[host] = now + self.delay
+        if queue:
+            heapq.heappush(self._ready, (now + self.delay, host))
+        else:
+            del self._hosts[host]
+        self.in_flight.add(url)
+        return url, 0.0
+
+    async def wait_turn(self, url):
+        """Sleep until `url`'s host may be requested again and book the slot after it."""
+        host = urlsplit(url).netloc
+        now = time.monotonic()
+        slot = max(now, self._next_fetch.get(host, 0.0))
+        self._next_fetch[host] = slot + self.delay
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+    def done(self, url):
+        """Mark a handed out URL as finished; it will not come back after a restart."""
+        self.in_flight.discard(url)
+        self._log.write(f"- {url}\n")
+        self._log_lines += 1
+
+    async def urls(self):
+        """Async iterator of URLs, paced per host; ends once nothing is pending or in flight."""
+        while True:
+            url, wait = self.pop()
+            if url is not None:
+                yield url
+            elif wait is None and not self.in_flight:
+                return
+            else:
+                await asyncio.sleep(min(wait or 0.05, 0.05))
+
+    def checkpoint(self):
+        """Make everything so far durable, compacting the log when it is mostly done work."""
+        self.seen.flush()
+        self._log.flush()
+        if self._log_lines > 2 * (self.pending + len(self.in_flight)) + 1000:
+            self._compact()
+        else:
+            os.fsync(self._log.fileno())
+
+    def _compact(self):
+        tmp = self.log_path.with_suffix('.tmp')
+        with open(tmp, 'w', encoding='utf-8') as outfile:
+            urls = list(self.in_flight) + [url for queue in self._hosts.values() for url in queue]
+            outfile.writelines(f"+ {url}\n" for url in urls)
+            outfile.flush()
+            os.fsync(outfile.fileno())
+        self._log.close()
+        os.replace(tmp, self.log_path)
+        self._log = open(self.log_path, 'a', encoding='utf-8')
+        self._log_lines = len(urls)
+
+    def close(self):
+        self.checkpoint()
+        self._log.close()
+        self.seen.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+async def crawl_frontier(frontier, crawler, handle, checkpoint_every=100):
+    """Crawl until the frontier is empty; `handle(result)` returns new URLs to queue.
+
+    The crawler's requests are paced by frontier.wait_turn for the duration of the crawl.
+    """
+    handled = 0
+    before_fetch, crawler.before_fetch = crawler.before_fetch, frontier.wait_turn
+    try:
+        async for result in crawler.crawl(frontier.urls()):
+            frontier.add_many(handle(result) or ())
+            frontier.done(result.url)
+            handled += 1
+            if handled % checkpoint_every == 0:
+                frontier.checkpoint()
+    finally:
+        crawler.before_fetch = before_fetch
+    frontier.checkpoint()
+    return handled
+
+
+if __name__ == '__main__':
+    import tempfile
+
+    from crawler import Crawler
+
+    async def main(state_dir):
+        with Frontier(state_dir, delay=0.5) as frontier:
+            frontier.add_many(['https://www.example.com', 'https://www.python.org',
+                               'https://www.python.org/about/', 'https://www.example.com#top'])
+            async with Crawler(concurrency=5, per_host=1) as crawler:
+                count = await crawl_frontier(frontier, crawler, lambda result: print(result))
+            print(f"{count} pages, {frontier.seen.count} URLs seen")
+
+    with tempfile.TemporaryDirectory() as state_dir:
+        asyncio.run(main(state_dir))
@@ -0,0 +1,90 @@
+import asyncio
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+from aiohttp import web
+from crawler import Crawler
+from frontier import BloomFilter, Frontier, crawl_frontier
+
+
+def test_bloom_filter_has_no_false_negatives(tmp_path):
+    bloom = BloomFilter(tmp_path / 'seen.bloom', capacity=1000, error_rate=0.01)
+    urls = [f"https://example.com/{i}" for i in range(1000)]
+    assert all(bloom.add(url) for url in urls[:500])
+    assert all(url in bloom for url in urls[:500])
+    false_positives = sum(url in bloom for url in urls[500:])
+    assert false_positives < 25
+
+def test_frontier_is_polite_per_host(tmp_path):
+    with Frontier(tmp_path, delay=10) as frontier:
+        frontier.add_many(['http://a/1', 'http://a/2', 'http://b/1', 'http://a/1#top'])
+        assert frontier.pending == 3
+        assert [frontier.pop(now=0)[0] for _ in range(2)] == ['http://a/1', 'http://b/1']
+        assert frontier.pop(now=0) == (None, 10)
+        assert frontier.pop(now=10)[0] == 'http://a/2'
+
+def test_frontier_resumes_unfinished_urls(tmp_path):
+    frontier = Frontier(tmp_path, delay=0)
+    frontier.add_many(['http://a/1', 'http://a/2', 'http://b/1'])
+    url, _ = frontier.pop()
+    frontier.done(url)
+    frontier.pop()  # handed out, never finished
+    frontier.checkpoint()  # the process dies here, without close()
+
+    resumed = Frontier(tmp_path, delay=0)
+    assert resumed.pending == 2
+    assert not resumed.add('http://a/1')
+    assert sorted(resumed.pop()[0] for _ in range(2)) == ['http://a/2', 'http://b/1']
+
+def test_urls_added_after_a_checkpoint_survive_a_crash(tmp_path):
+    script = f"""
+import os
+from frontier import Frontier
+frontier = Frontier({str(tmp_path)!r})
+frontier.add('http://a/0')
+frontier.done(frontier.pop()[0])
+frontier.checkpoint()
+frontier.add_many(['http://a/1', 'http://b/1', 'http://c/1'])
+os._exit(1)
+"""
+    result = subprocess.run([sys.executable, '-c', script], cwd=Path(__file__).parent)
+    assert result.returncode == 1
+
+    resumed = Frontier(tmp_path, delay=0)
+    assert resumed.pending == 3
+    assert not resumed.add('http://b/1')
+    assert sorted(resumed.pop()[0] for _ in range(3)) == ['http://a/1', 'http://b/1', 'http://c/1']
+
+def test_requests_to_one_host_are_paced_when_fetched(tmp_path):
+    arrivals = []
+
+    async def page(request):
+        arrivals.append((request.host, time.monotonic()))
+        if request.match_info['name'].startswith('slow'):
+            await asyncio.sleep(0.5)
+        return web.Response(text='<html></html>', content_type='text/html')
+
+    async def run():
+        app = web.Application()
+        app.router.add_get('/{name}', page)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, '127.0.0.1', 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        fast, slow = f"127.0.0.1:{port}", f"localhost:{port}"
+        try:
+            with Frontier(tmp_path, delay=0.2) as frontier:
+                frontier.add_many([f"http://{slow}/slow{i}" for i in range(2)])
+                frontier.add_many([f"http://{fast}/fast{i}" for i in range(4)])
+                async with Crawler(concurrency=2, per_host=1) as crawler:
+                    return await crawl_frontier(frontier, crawler, lambda result: None)
+        finally:
+            await runner.cleanup()
+
+    assert asyncio.run(run()) == 6
+    fast_times = [at for host, at in arrivals if host.startswith('127.0.0.1')]
+    assert len(fast_times) == 4
+    assert min(b - a for a, b in zip(fast_times, fast_times[1:])) >= 0.19
@@ -0,0 +1,307 @@
+"""
+map / filter / reduce / fold from 09_lambda.py, without the two slow paths used there.
+
+1. reduce(lambda acc, item: {**acc, item[0]: item[1]}, pairs, {}) copies the whole dict on
+   every step: O(n²) time and garbage. fold() and reduce() look at the lambda's source and
+   recognize the "copy the accumulator and add to it" forms:
+       {**acc, k: v}   acc | {k: v}     ->  acc[k] = v
+       acc + [x]       [*acc, x]        ->  acc.append(x)
+       {*acc, x}       acc | {x}        ->  acc.add(x)
+   When the initial value is a plain dict / list / set, they run that as a loop that updates
+   one copy of it in place. Anything else, or a lambda whose source cannot be found, runs
+   as an ordinary reduce.
+   fold_in_place() is the explicit version: the function mutates the accumulator.
+2. map / filter / reduce with a lambda pay one Python call per element. With vectorize=True,
+   map() and filter() call the function once with the whole NumPy array or array.array (or
+   list, tuple or range, with numeric=True) instead, which works for arithmetic lambdas like
+   `lambda x: x ** 2` or `lambda x: x % 2 == 0`. It is opt in because only the caller knows the
+   function is safe to call that way: it is never tried on a guess, so a function with side
+   effects is not run twice. reduce() maps operator.add/mul, max, min and lambdas like
+   `lambda x, y: x + y` to ufunc reductions by looking at them, without calling them.
+   NumPy uses fixed width numbers, which is why lists only switch over when asked: squaring
+   a big Python int does not overflow, squaring an int64 does.
+"""
+import ast
+import builtins
+import functools
+import linecache
+import operator
+from array import array
+
+import numpy as np
+
+_MISSING = object()
+MIN_VECTOR_SIZE = 32
+
+_REDUCTIONS = {
+    operator.add: np.add, operator.mul: np.multiply, builtins.max: np.maximum, builtins.min: np.minimum,
+    operator.and_: np.bitwise_and, operator.or_: np.bitwise_or, operator.xor: np.bitwise_xor,
+}
+_BINARY_OPS = {ast.Add: np.add, ast.Mult: np.multiply, ast.BitAnd: np.bitwise_and,
+               ast.BitOr: np.bitwise_or, ast.BitXor: np.bitwise_xor}
+
+
+# Finding a lambda's syntax tree
+@functools.lru_cache(maxsize=64)
+def _module_tree(filename):
+    source = ''.join(linecache.getlines(filename))
+    return ast.parse(source) if source else None
+
+
+def _lambda_node(fn):
+    """The ast.Lambda that `fn` was compiled from, or None."""
+    code = getattr(fn, '__code__', None)
+    if code is None or fn.__name__ != '<lambda>':
+        return None
+    try:
+        tree = _module_tree(code.co_filename)
+    except (OSError, SyntaxError, ValueError):
+        return None
+    if tree is None:
+        return None
+    # The positions of the lambda's own instructions lie inside its node.
+    positions = {(line, col) for line, _, col, _ in code.co_positions() if line and col is not None}
+    candidates = [node for node in ast.walk(tree) if isinstance(node, ast.Lambda)
+                  and node.lineno <= code.co_firstlineno <= node.end_lineno
+                  and any(_inside(node.body, position) for position in positions)]
+    # Nested lambdas: the innermost one is the function itself.
+    return min(candidates, key=lambda node: len(ast.unparse(node)), default=None)
+
+
+def _inside(node, position):
+    line, col = position
+    start, end = (node.lineno, node.col_offset), (node.end_lineno, node.end_col_offset)
+    return start <= (line, col) < end
+
+
+def _params(node):
+    args = node.args
+    if args.vararg or args.kwarg or args.kwonlyargs or args.posonlyargs or len(args.args) != 2:
+        return None
+    return [arg.arg for arg in args.args]
+
+
+def _uses(name, nodes):
+    return any(isinstance(sub, ast.Name) and sub.id == name for node in nodes for sub in ast.walk(node))
+
+
+# In-place folds
+def _in_place_statements(body, acc):
+    """(accumulator type, new items, statements adding them in place) for a copying lambda body."""
+    is_acc = lambda node: isinstance(node, ast.Name) and node.id == acc
+    if isinstance(body, ast.Dict) and body.keys and body.keys[0] is None and is_acc(body.values[0]):
+        pairs = list(zip(body.keys[1:], body.values[1:]))
+        if None in body.keys[1:]:
+            return None
+        return dict, pairs, _assignments(acc, pairs)
+    if isinstance(body, ast.BinOp) and is_acc(body.left):
+        right = body.right
+        if isinstance(body.op, ast.BitOr) and isinstance(right, ast.Dict) and None not in right.keys:
+            pairs = list(zip(right.keys, right.values))
+            return dict, pairs, _assignments(acc, pairs)
+        if isinstance(body.op, ast.Add) and isinstance(right, ast.List) and not _starred(right.elts):
+            return list, right.elts, _calls(acc, 'append', 'extend', right.elts)
+        if isinstance(body.op, ast.BitOr) and isinstance(right, ast.Set) and not _starred(right.elts):
+            return set, right.elts, _calls(acc, 'add', 'update', right.elts)
+    if isinstance(body, (ast.List, ast.Set)) and body.elts and isinstance(body.elts[0], ast.Starred) \
+            and is_acc(body.elts[0].value) and not _starred(body.elts[1:]):
+        elts = body.elts[1:]
+        if isinstance(body, ast.List):
+            return list, elts, _calls(acc, 'append', 'extend', elts)
+        return set, elts, _calls(acc, 'add', 'update', elts)
+    return None
+
+
+def _starred(elts):
+    return any(isinstance(elt, ast.Starred) for elt in elts)
+
+
+def _assignments(acc, pairs):
+    return [f"{acc}[{ast.unparse(key)}] = {ast.unparse(value)}" for key, value in pairs]
+
+
+def _calls(acc, one, many, elts):
+    if len(elts) == 1:
+        return [f"{acc}.{one}({ast.unparse(elts[0])})"]
+    return [f"{acc}.{many}(({', '.join(ast.unparse(elt) for elt in elts)},))"]
+
+
+def _in_place_loop(fn):
+    """(accumulator type, compiled loop) for a copying fold lambda, or None."""
+    code = fn.__code__
+    node = _lambda_node(fn)
+    params = node and _params(node)
+    if not params:
+        return None
+    acc, item = params
+    found = _in_place_statements(node.body, acc)
+    if found is None:
+        return None
+    kind, parts, statements = found
+    nodes = [node for part in parts for node in (part if isinstance(part, tuple) else (part,))]
+    if len(parts) > 1 and _uses(acc, nodes):
+        return None  # each new item must see the accumulator from before the step
+    body = '\n'.join(f"        {statement}" for statement in statements)
+    source = (f"def fold_loop({acc}, __iterable):\n"
+              f"    for {item} in __iterable:\n{body}\n"
+              f"    return {acc}\n")
+    return kind, compile(source, f"<in-place fold of {code.co_filename}:{code.co_firstlineno}>", 'exec')
+
+
+_LOOPS = {}  # lambda code object -> result of _in_place_loop
+
+
+def _in_place(fn, initial):
+    """A loop equivalent to folding `fn` over an iterable, but mutating one accumulator."""
+    code = getattr(fn, '__code__', None)
+    if code is None or type(initial) not in (dict, list, set):
+        return None
+    if code not in _LOOPS:
+        _LOOPS[code] = _in_place_loop(fn)
+    found = _LOOPS[code]
+    if found is None or found[0] is not type(initial):
+        return None
+    namespace = dict(fn.__globals__)
+    namespace.update(zip(code.co_freevars, (cell.cell_contents for cell in fn.__closure__ or ())))
+    exec(found[1], namespace)
+    return namespace['fold_loop']
+
+
+def fold_in_place(update, iterable, initial):
+    """Fold with a function that mutates the accumulator (its return value is ignored)."""
+    acc = initial
+    for item in iterable:
+        update(acc, item)
+    return acc
+
+
+def fold(fn, iterable, initial, numeric=False):
+    """reduce() with a required start value."""
+    return reduce(fn, iterable, initial, numeric)
+
+
+def reduce(fn, iterable, initial=_MISSING, numeric=False):
+    """functools.reduce, with in-place folds and NumPy reductions where they apply."""
+    if initial is not _MISSING:
+        loop = _in_place(fn, initial)
+        if loop is not None:
+            return loop(initial.copy(), iterable)
+    data = _as_array(iterable, numeric)
+    ufunc = _numeric_reduction(fn, data) if data is not None else None
+    if ufunc is not None and (len(data) or initial is not _MISSING):
+        return _reduce_array(ufunc, data, initial)
+    if initial is _MISSING:
+        return functools.reduce(fn, iterable)
+    return functools.reduce(fn, iterable, initial)
+
+
+# NumPy dispatch
+def _as_array(data, numeric):
+    """`data` as a numeric ndarray when it should be vectorized, else None."""
+    if isinstance(data, np.ndarray):
+        array_data = data
+    elif isinstance(data, array) and data.typecode not in 'uw':
+        array_data = np.asarray(memoryview(data))
+    elif numeric and isinstance(data, (list, tuple, range)) and len(data) >= MIN_VECTOR_SIZE:
+        array_data = np.asarray(data)
+    else:
+        return None
+    return array_data if array_data.dtype.kind in 'biuf' and array_data.ndim == 1 else None
+
+
+def _numeric_reduction(fn, data):
+    try:
+        if fn in _REDUCTIONS:
+            return _REDUCTIONS[fn]
+    except TypeError:  # unhashable callable
+        return None
+    node = _lambda_node(fn)
+    params = node and _params(node)
+    if not params:
+        return None
+    body, (x, y) = node.body, params
+    names = lambda *nodes: [n.id if isinstance(n, ast.Name) else None for n in nodes]
+    if isinstance(body, ast.BinOp) and type(body.op) in _BINARY_OPS \
+            and sorted(names(body.left, body.right)) == sorted([x, y]):
+        return _BINARY_OPS[type(body.op)]
+    if isinstance(body, ast.Call) and isinstance(body.func, ast.Name) and body.func.id in ('max', 'min') \
+            and not body.keywords and sorted(names(*body.args)) == sorted([x, y]):
+        return np.maximum if body.func.id == 'max' else np.minimum
+    return None
+
+
+def _reduce_array(ufunc, data, initial):
+    if len(data) == 0:
+        return initial
+    result = ufunc.reduce(data)
+    if initial is not _MISSING:
+        result = ufunc(initial, result)
+    return result.item() if isinstance(result, np.generic) else result
+
+
+def _vectorized(fn, data, dtype=None):
+    result = fn(data)
+    if not isinstance(result, np.ndarray) or result.shape != data.shape \
+            or (dtype is not None and result.dtype != dtype):
+        raise TypeError(f"{fn!r} called with a whole array did not return a matching array; "
+                        f"call it without vectorize=True")
+    return result
+
+
+def map(fn, iterable, numeric=False, vectorize=False):
+    """fn applied to every item: a list, or with vectorize=True and array input, fn(array)."""
+    data = _as_array(iterable, numeric) if vectorize else None
+    if data is not None:
+        return _vectorized(fn, data)
+    return list(builtins.map(fn, iterable))
+
+
+def filter(predicate, iterable, numeric=False, vectorize=False):
+    """Items for which predicate is true: a list, or with vectorize=True and array input, an
+    ndarray selected by the boolean mask predicate(array)."""
+    data = _as_array(iterable, numeric) if vectorize else None
+    if data is not None:
+        return data[_vectorized(predicate, data, bool)]
+    return list(builtins.filter(predicate, iterable))
+
+
+def benchmark(sizes=(1_000_000, 10_000_000)):
+    import time
+
+    def timed(run):
+        start = time.perf_counter()
+        result = run()
+        return result, time.perf_counter() - start
+
+    print("building a dict from (key, value) pairs:")
+    for n in (10_000, 20_000, 40_000):
+        pairs = [(i, i) for i in range(n)]
+        _, seconds = timed(lambda: functools.reduce(lambda acc, item: {**acc, item[0]: item[1]}, pairs, {}))
+        print(f"  functools.reduce {{**acc}}, {n:>10,} pairs: {seconds:.2f}s")
+    for n in sizes:
+        pairs = [(i, i) for i in range(n)]
+        result, seconds = timed(lambda: fold(lambda acc, item: {**acc, item[0]: item[1]}, pairs, {}))
+        assert len(result) == n
+        print(f"  fold {{**acc}} (in place),  {n:>10,} pairs: {seconds:.2f}s")
+        del pairs, result
+
+    print("map / filter / reduce with lambdas:")
+    for n in sizes:
+        numbers = list(range(n))
+        vector = np.arange(n, dtype=np.int64)
+        square, even, add = (lambda x: x * x), (lambda x: x % 2 == 0), (lambda x, y: x + y)
+        for name, builtin_run, numpy_run in [
+            ('map', lambda: list(builtins.map(square, numbers)), lambda: map(square, vector, vectorize=True)),
+            ('filter', lambda: list(builtins.filter(even, numbers)), lambda: filter(even, vector, vectorize=True)),
+            ('reduce', lambda: functools.reduce(add, numbers), lambda: reduce(add, vector)),
+        ]:
+            expected, per_element = timed(builtin_run)
+            result, vectorized = timed(numpy_run)
+            assert np.array_equal(result, expected)
+            print(f"  {name:>6}, {n:>10,} items: lambda per element {per_element:.2f}s, "
+                  f"NumPy {vectorized:.3f}s")
+        del numbers, vector
+
+
+if __name__ == '__main__':
+    benchmark()
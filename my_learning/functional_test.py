@@ -0,0 +1,51 @@
+import operator
+
+import numpy as np
+import pytest
+
+import functional
+
+
+def test_copying_folds_run_in_place_with_the_same_result():
+    pairs = [('a', 1), ('b', 2), ('a', 3)]
+    initial = {}
+    to_dict = lambda acc, item: {**acc, item[0]: item[1]}
+
+    assert functional._in_place(to_dict, initial) is not None
+    assert functional.fold(to_dict, pairs, initial) == {'a': 3, 'b': 2}
+    assert initial == {}  # the start value is copied, never mutated
+    assert functional.fold(lambda acc, x: acc + [x, -x], range(3), []) == [0, 0, 1, -1, 2, -2]
+    assert functional.fold(lambda seen, x: {*seen, x % 3}, range(10), set()) == {0, 1, 2}
+
+    # Several new keys that read the accumulator: each must see the old one, so no rewrite.
+    both = lambda acc, x: {**acc, x: len(acc), -x: len(acc)}
+    assert functional._in_place(both, {}) is None
+    assert functional.fold(both, [1, 2], {}) == {1: 0, -1: 0, 2: 2, -2: 2}
+
+
+def test_numeric_pipelines_dispatch_to_numpy_when_asked():
+    values = np.arange(10)
+
+    assert np.array_equal(functional.map(lambda x: x * x, values, vectorize=True), values * values)
+    assert np.array_equal(functional.filter(lambda x: x % 2 == 0, values, vectorize=True), [0, 2, 4, 6, 8])
+    assert functional.reduce(lambda x, y: y + x, values, 5) == 50
+    assert functional.reduce(operator.mul, np.arange(1, 5)) == 24
+    assert functional.reduce(max, np.array([], dtype=int), -1) == -1
+    assert functional.map(lambda x: x if x > 7 else 0, values) == [0] * 8 + [8, 9]
+    assert functional.map(str, [1, 2], vectorize=True) == ['1', '2']  # not an array: per element
+    with pytest.raises(ValueError):
+        functional.map(lambda x: x if x > 7 else 0, values, vectorize=True)
+    with pytest.raises(TypeError):
+        functional.filter(lambda x: x * 2, values, vectorize=True)
+
+
+def test_functions_are_called_once_per_item():
+    calls = []
+    double = lambda x: calls.append(x) or x * 2
+
+    assert functional.map(double, np.arange(3)) == [0, 2, 4]
+    assert functional.filter(double, np.arange(3)) == [1, 2]
+    assert len(calls) == 6  # never called with the whole array first
+    calls.clear()
+    assert functional.map(double, np.arange(3), vectorize=True).tolist() == [0, 2, 4]
+    assert len(calls) == 1
@@ -0,0 +1,212 @@
+"""
+A small key-value store on top of a JSON file, for state like numbers.json / username.json.
+
+08_files.py rewrites the whole file with json.dumps + write_text on every change (a crash in
+the middle leaves a truncated file) and parses it again on every read. JsonStore instead:
+- keeps the data as a JSON object snapshot (<name>.json) plus an append-only log of changes
+  (<name>.json.log, one JSON line per set/delete), so an update writes one record
+- folds the log back into the snapshot every `compact_every` records, writing a temporary
+  file and renaming it over the old one, so readers see either the old or the new snapshot
+- serves reads from memory, reloading only when the files' mtime or size changed (another
+  process wrote to them); when only the log grew, just the new lines are read
+"""
+import json
+import os
+import tempfile
+from pathlib import Path
+
+_MISSING = object()
+
+
+def write_json_atomic(path, data):
+    """Replace a JSON file in one step: write a temporary file, fsync it, rename it over."""
+    path = Path(path)
+    fd, tmp = tempfile.mkstemp(dir=path.parent or '.', prefix=f".{path.name}-")
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as outfile:
+            json.dump(data, outfile)
+            outfile.flush()
+            os.fsync(outfile.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        Path(tmp).unlink(missing_ok=True)
+        raise
+
+
+def _stamp(path):
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return stat.st_ino, stat.st_mtime_ns, stat.st_size  # inode: a replaced file is a new file
+
+
+class JsonStore:
+    """Dict-like persistent store: O(record) updates, cached reads, atomic compaction."""
+
+    def __init__(self, path, compact_every=1000, fsync=False):
+        self.path = Path(path)
+        self.log_path = self.path.with_name(self.path.name + '.log')
+        self.compact_every = compact_every
+        self.fsync = fsync
+        self._data = {}
+        self._snapshot_stamp = self._log_stamp = None
+        self._log_offset = 0
+        self._log_records = 0
+        self._log = None
+        self._refresh()
+
+    # Reading
+    def _refresh(self):
+        """Reload whatever changed on disk since the last look."""
+        snapshot_stamp, log_stamp = _stamp(self.path), _stamp(self.log_path)
+        if snapshot_stamp != self._snapshot_stamp:
+            # Another store compacted: the log we had open (if any) was unlinked with it.
+            self._close_log()
+            self._data = self._read_snapshot()
+            self._snapshot_stamp = snapshot_stamp
+            self._log_offset = self._log_records = 0
+            self._log_stamp = None
+        if log_stamp != self._log_stamp:
+            old = self._log_stamp
+            replaced = old is not None and log_stamp is not None and log_stamp[0] != old[0]
+            if log_stamp is None or log_stamp[2] < self._log_offset or replaced:
+                # Another store compacted the log away: start again from the snapshot.
+                self._close_log()
+                self._data = self._read_snapshot()
+                self._log_offset = self._log_records = 0
+            if log_stamp is not None:
+                self._replay_log()
+            self._log_stamp = log_stamp
+
+    def _read_snapshot(self):
+        try:
+            text = self.path.read_text(encoding='utf-8')
+        except FileNotFoundError:
+            return {}
+        return json.loads(text) if text.strip() else {}
+
+    def _replay_log(self):
+        """Apply the log records written since `_log_offset`.
+
+        A torn last line is left for later (the next append cuts it off); a complete line
+        that does not decode is skipped.
+        """
+        with open(self.log_path, 'rb') as infile:
+            infile.seek(self._log_offset)
+            for line in infile:
+                if not line.endswith(b'\n'):
+                    break
+                self._log_offset += len(line)
+                self._log_records += 1
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                self._apply(record)
+
+    def _apply(self, record):
+        if record['op'] == 'set':
+            self._data[record['key']] = record['value']
+        else:
+            self._data.pop(record['key'], None)
+
+    def get(self, key, default=None):
+        self._refresh()
+        return self._data.get(key, default)
+
+    def __getitem__(self, key):
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            raise KeyError(key)
+        return value
+
+    def __contains__(self, key):
+        return self.get(key, _MISSING) is not _MISSING
+
+    def to_dict(self):
+        self._refresh()
+        return dict(self._data)
+
+    # Writing
+    def _append(self, record):
+        self._refresh()
+        if self._log is None:
+            self._log = open(self.log_path, 'ab')
+        if self._log_stamp is not None and self._log_stamp[2] > self._log_offset:
+            # A writer crashed in the middle of a record: cut the fragment off first.
+            self._log.truncate(self._log_offset)
+        line = (json.dumps(record) + '\n').encode('utf-8')
+        self._log.write(line)
+        self._log.flush()
+        if self.fsync:
+            os.fsync(self._log.fileno())
+        self._apply(record)
+        self._log_offset += len(line)
+        self._log_records += 1
+        self._log_stamp = _stamp(self.log_path)
+        if self._log_records >= self.compact_every:
+            self.compact()
+
+    def set(self, key, value):
+        self._append({'op': 'set', 'key': key, 'value': value})
+
+    __setitem__ = set
+
+    def delete(self, key):
+        self._append({'op': 'delete', 'key': key})
+
+    __delitem__ = delete
+
+    def update(self, values):
+        for key, value in values.items():
+            self.set(key, value)
+
+    def compact(self):
+        """Write the current data as the new snapshot and start an empty log."""
+        self._refresh()
+        write_json_atomic(self.path, self._data)
+        self._close_log()
+        self.log_path.unlink(missing_ok=True)
+        self._snapshot_stamp = _stamp(self.path)
+        self._log_stamp = None
+        self._log_offset = self._log_records = 0
+
+    def _close_log(self):
+        if self._log is not None:
+            self._log.close()
+            self._log = None
+
+    def close(self, compact=False):
+        if compact and self._log_records:
+            self.compact()
+        self._close_log()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+if __name__ == '__main__':
+    import time
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = Path(directory) / 'state.json'
+        updates = 2000
+        data = {f"user{i}": {'visits': 0} for i in range(1000)}
+
+        start = time.perf_counter()
+        for i in range(updates):
+            data[f"user{i % 1000}"] = {'visits': i}
+            path.write_text(json.dumps(data))
+        rewrite = time.perf_counter() - start
+
+        write_json_atomic(path, {})
+        start = time.perf_counter()
+        with JsonStore(path, compact_every=500) as store:
+            for i in range(updates):
+                store.set(f"user{i % 1000}", {'visits': i})
+        logged = time.perf_counter() - start
+        print(f"{updates} updates: rewrite whole file {rewrite:.2f}s, JsonStore {logged:.2f}s")
@@ -0,0 +1,58 @@
+import json
+
+from json_store import JsonStore
+
+
+def test_log_replay_compaction_and_cache_invalidation(tmp_path):
+    path = tmp_path / 'numbers.json'
+    path.write_text(json.dumps({'numbers': [2, 3]}))
+    writer = JsonStore(path, compact_every=4)
+    reader = JsonStore(path)
+
+    writer.set('numbers', [2, 3, 4])
+    writer.set('username', 'eric')
+    writer.delete('username')
+    assert reader.to_dict() == {'numbers': [2, 3, 4]}
+    assert json.loads(path.read_text()) == {'numbers': [2, 3]}  # only the log was written
+
+    writer.set('username', 'fadi')  # fourth record: compacted into numbers.json
+    assert not writer.log_path.exists()
+    assert json.loads(path.read_text()) == {'numbers': [2, 3, 4], 'username': 'fadi'}
+    assert reader['username'] == 'fadi'
+
+    writer.set('numbers', [])
+    with open(writer.log_path, 'ab') as log:
+        log.write(b'{"op": "set", "key": "torn"')  # crash in the middle of a write
+    writer.close()
+    assert JsonStore(path).to_dict() == {'numbers': [], 'username': 'fadi'}
+
+
+def test_append_after_torn_write_keeps_the_log_readable(tmp_path):
+    path = tmp_path / 'numbers.json'
+    with JsonStore(path) as store:
+        store.set('numbers', [1])
+    with open(path.with_name('numbers.json.log'), 'ab') as log:
+        log.write(b'{"op": "set", "key": "torn"')  # crash in the middle of a write
+
+    store = JsonStore(path)
+    store.set('username', 'fadi')
+    store.close()
+    assert JsonStore(path).to_dict() == {'numbers': [1], 'username': 'fadi'}
+
+    with open(store.log_path, 'ab') as log:
+        log.write(b'not json\n')
+    assert JsonStore(path).to_dict() == {'numbers': [1], 'username': 'fadi'}
+
+
+def test_writes_survive_another_store_compacting(tmp_path):
+    path = tmp_path / 'state.json'
+    a, b = JsonStore(path), JsonStore(path)
+    a.set('x', 1)
+    b.set('z', 3)
+    b.compact()  # unlinks the log `a` still has open
+    a.set('y', 2)
+    b.set('w', 4)
+    expected = {'x': 1, 'z': 3, 'y': 2, 'w': 4}
+    assert a.to_dict() == b.to_dict() == JsonStore(path).to_dict() == expected
+    a.close()
+    b.close()
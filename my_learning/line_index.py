@@ -0,0 +1,146 @@
+"""
+Random access to the lines of a big text file.
+
+lines_from_file() and matching_lines_from_file() in 08_files.py always read from the top, so
+"give me line 5,000,000" or "search again for another pattern" costs a full read each time.
+LineIndex memory-maps the file once and records where every line starts in an array('Q'):
+- index[n] is one slice of the mmap, no scanning
+- index[a:b] and reversed(index) come for free from the offsets
+- the offsets are saved next to the file (<name>.lineidx) and reused while the file's size
+  and mtime are unchanged; where that file cannot be written they are only kept in memory
+- search() runs one compiled regex over the whole mapped buffer and maps every match back to
+  its line with a binary search over the offsets
+"""
+import mmap
+import os
+import re
+import struct
+from array import array
+from bisect import bisect_right
+from itertools import accumulate, islice
+from pathlib import Path
+
+SIDECAR_SUFFIX = '.lineidx'
+SIDECAR_HEADER = struct.Struct('<QQ')  # file size, mtime in ns
+CHUNK_SIZE = 16 * 1024 * 1024
+
+
+def build_offsets(buffer, chunk_size=CHUNK_SIZE):
+    """array('Q') of the start offset of every line, plus the end of the buffer."""
+    offsets = array('Q', [0])
+    size = len(buffer)
+    start = 0
+    while start < size:
+        chunk = buffer[start:start + chunk_size]
+        # Every line but the last in the chunk ends with b'\n'; len + 1 steps over it.
+        lengths = map(len, chunk.split(b'\n')[:-1])
+        ends = accumulate((length + 1 for length in lengths), initial=start)
+        offsets.extend(islice(ends, 1, None))  # skip `initial`, already in offsets
+        start += len(chunk)
+    if offsets[-1] != size:
+        offsets.append(size)  # last line without a trailing newline
+    return offsets
+
+
+class LineIndex:
+    """Indexable, sliceable, reversible view of the lines of a file."""
+
+    def __init__(self, path, encoding='utf-8', persist=True):
+        self.path = Path(path)
+        self.encoding = encoding
+        self._file = open(self.path, 'rb')
+        stat = os.fstat(self._file.fileno())
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if stat.st_size else b''
+        self.offsets = self._load_offsets(stat, persist)
+
+    def _load_offsets(self, stat, persist):
+        sidecar = self.path.with_name(self.path.name + SIDECAR_SUFFIX)
+        key = SIDECAR_HEADER.pack(stat.st_size, stat.st_mtime_ns)
+        if persist and sidecar.exists():
+            data = sidecar.read_bytes()
+            if data[:SIDECAR_HEADER.size] == key:
+                offsets = array('Q')
+                offsets.frombytes(data[SIDECAR_HEADER.size:])
+                return offsets
+
+        offsets = build_offsets(self._map)
+        if persist:
+            tmp = sidecar.with_name(sidecar.name + '.tmp')
+            try:
+                tmp.write_bytes(key + offsets.tobytes())
+                os.replace(tmp, sidecar)
+            except OSError:  # e.g. a read-only directory: keep the offsets in memory only
+                try:
+                    tmp.unlink(missing_ok=True)
+                except OSError:
+                    pass
+        return offsets
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def _raw_line(self, n):
+        """Line n as bytes, without its b'\n' or b'\r\n' ending."""
+        return self._map[self.offsets[n]:self.offsets[n + 1]].removesuffix(b'\n').removesuffix(b'\r')
+
+    def _line(self, n):
+        return self._raw_line(n).decode(self.encoding)
+
+    def __getitem__(self, n):
+        if isinstance(n, slice):
+            return [self._line(i) for i in range(*n.indices(len(self)))]
+        if n < 0:
+            n += len(self)
+        if not 0 <= n < len(self):
+            raise IndexError(f"line {n} out of range")
+        return self._line(n)
+
+    def __iter__(self):
+        return (self._line(n) for n in range(len(self)))
+
+    def __reversed__(self):
+        return (self._line(n) for n in range(len(self) - 1, -1, -1))
+
+    def line_number(self, offset):
+        """The line containing a byte offset."""
+        return bisect_right(self.offsets, offset) - 1
+
+    def search(self, pattern, flags=0):
+        """Yield (line number, line) for every line with a match, each line once.
+
+        In a file with \r\n line endings `$` would not match before the \r, so there every
+        line is searched on its own, without its ending.
+        """
+        if isinstance(pattern, str):
+            pattern = pattern.encode(self.encoding)
+        regex = re.compile(pattern, flags | re.MULTILINE)
+        if self._map.find(b'\r\n') != -1:
+            for n in range(len(self)):
+                line = self._raw_line(n)
+                if regex.search(line):
+                    yield n, line.decode(self.encoding)
+            return
+        last = -1
+        for match in regex.finditer(self._map):
+            n = self.line_number(match.start())
+            if n != last:
+                last = n
+                yield n, self._line(n)
+
+    def close(self):
+        if isinstance(self._map, mmap.mmap):
+            self._map.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+if __name__ == '__main__':
+    with LineIndex('pi_digits.text', persist=False) as lines:
+        print(f"{len(lines)} lines, last: {lines[-1]!r}")
+        print(list(reversed(lines)))
+        print(list(lines.search(r'love')))
@@ -0,0 +1,85 @@
+import os
+import re
+from pathlib import Path
+
+import pytest
+
+import line_index
+from line_index import LineIndex, build_offsets
+
+
+@pytest.fixture
+def text_file(tmp_path):
+    path = tmp_path / 'lines.txt'
+    path.write_text("first line\nsecond\n\nlove, love\nlast, no newline")
+    return path
+
+
+def test_offsets_are_the_same_for_every_chunk_size():
+    data = b"a\nbb\n\nccc\ndddd\ne"
+    for chunk_size in range(1, len(data) + 2):
+        assert build_offsets(data, chunk_size).tolist() == [0, 2, 5, 6, 10, 15, 16]
+        assert build_offsets(data + b'\n', chunk_size).tolist() == [0, 2, 5, 6, 10, 15, 17]
+    assert build_offsets(b'').tolist() == [0]
+
+
+def test_indexing_slicing_and_reversing(text_file):
+    with LineIndex(text_file, persist=False) as lines:
+        assert len(lines) == 5
+        assert lines[0] == 'first line'
+        assert lines[2] == ''
+        assert lines[-1] == 'last, no newline'
+        assert lines[-5] == 'first line'
+        assert lines[1:3] == ['second', '']
+        assert lines[-2:] == ['love, love', 'last, no newline']
+        assert lines[::-2] == ['last, no newline', '', 'first line']
+        assert list(reversed(lines)) == list(lines)[::-1]
+        with pytest.raises(IndexError):
+            lines[5]
+        with pytest.raises(IndexError):
+            lines[-6]
+
+
+def test_search_reports_each_line_once(text_file):
+    with LineIndex(text_file, persist=False) as lines:
+        assert list(lines.search('love')) == [(3, 'love, love')]
+        assert list(lines.search(r'^\w+', re.IGNORECASE)) == [
+            (0, 'first line'), (1, 'second'), (3, 'love, love'), (4, 'last, no newline')]
+
+
+def test_sidecar_is_reused_until_the_file_changes(text_file, monkeypatch):
+    builds = []
+    monkeypatch.setattr(line_index, 'build_offsets', lambda buffer: builds.append(1) or build_offsets(buffer))
+    sidecar = text_file.with_name(text_file.name + line_index.SIDECAR_SUFFIX)
+
+    with LineIndex(text_file):
+        assert sidecar.exists()
+    with LineIndex(text_file) as lines:
+        assert lines[3] == 'love, love'
+    assert len(builds) == 1
+
+    mtime = text_file.stat().st_mtime_ns + 10**9
+    os.utime(text_file, ns=(mtime, mtime))
+    with LineIndex(text_file) as lines:
+        assert len(lines) == 5
+    assert len(builds) == 2
+
+
+def test_read_only_directory_keeps_the_offsets_in_memory(text_file, monkeypatch):
+    def read_only(self, data):
+        raise PermissionError(13, "Permission denied", str(self))
+
+    monkeypatch.setattr(Path, 'write_bytes', read_only)  # chmod would not stop root
+    with LineIndex(text_file) as lines:
+        assert lines[-1] == 'last, no newline'
+    assert not text_file.with_name(text_file.name + line_index.SIDECAR_SUFFIX).exists()
+
+
+def test_crlf_line_endings_are_stripped(tmp_path):
+    path = tmp_path / 'windows.txt'
+    path.write_bytes(b"one\r\ntwo\r\nthree\r\nzero")
+    with LineIndex(path, persist=False) as lines:
+        assert list(lines) == ['one', 'two', 'three', 'zero']
+        assert lines[-2:] == ['three', 'zero']
+        assert list(lines.search(r'o$')) == [(1, 'two'), (3, 'zero')]
+        assert list(lines.search(r'^t')) == [(1, 'two'), (2, 'three')]
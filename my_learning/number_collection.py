@@ -0,0 +1,110 @@
+"""
+NumberCollection from 06_iterators.py, without the O(n²) and without eating its data.
+
+The old version returned self from __iter__ and popped numbers.pop(0) in __next__. Each pop
+shifts the whole list, so a full loop costs O(n²). The loop also empties the collection, so
+reverse_iter() afterwards has nothing left. Here:
+- the numbers live in a compact array ('q' for ints, 'd' as soon as there is a float),
+  8 bytes each instead of a list of int objects
+- iter() and reverse_iter() return a new NumberIterator every time. It only moves an index,
+  so the collection can be looped over as often as needed and each loop is O(n)
+- iter_batches(n) yields memoryview slices of the array: no copying, and consumers like
+  sum() or numpy.frombuffer() handle a whole batch in C instead of one element at a time
+"""
+from array import array
+
+
+class NumberIterator:
+    """Walks a NumberCollection by index, forwards or backwards, without changing it."""
+
+    def __init__(self, collection, reverse=False):
+        self.numbers = collection.numbers
+        self.step = -1 if reverse else 1
+        self.index = len(self.numbers) - 1 if reverse else 0
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        index = self.index
+        if not 0 <= index < len(self.numbers):
+            raise StopIteration
+        self.index = index + self.step
+        return self.numbers[index]
+
+    def __length_hint__(self):
+        return max(0, self.index + 1 if self.step < 0 else len(self.numbers) - self.index)
+
+
+class NumberCollection:
+    def __init__(self, numbers=(), typecode=None):
+        if isinstance(numbers, array) and typecode in (None, numbers.typecode):
+            self.numbers = array(numbers.typecode, numbers)
+            return
+        numbers = numbers if isinstance(numbers, (list, tuple)) else list(numbers)
+        if typecode is None:
+            typecode = 'd' if any(isinstance(number, float) for number in numbers) else 'q'
+        self.numbers = array(typecode, numbers)
+
+    def __len__(self):
+        return len(self.numbers)
+
+    def __getitem__(self, index):
+        return self.numbers[index]
+
+    def __iter__(self):
+        return NumberIterator(self)
+
+    def __reversed__(self):
+        return NumberIterator(self, reverse=True)
+
+    def reverse_iter(self):
+        return NumberIterator(self, reverse=True)
+
+    def append(self, number):
+        self.numbers.append(number)
+
+    def extend(self, numbers):
+        self.numbers.extend(numbers)
+
+    def iter_batches(self, n):
+        """Yield memoryview slices of at most n numbers. They share memory with the collection.
+
+        Batches stay valid after the loop moves on (list(c.iter_batches(n)) works). The
+        collection cannot grow while a batch view is alive (the array raises BufferError).
+        """
+        if n < 1:
+            raise ValueError("Batch size must be at least 1")
+        view = memoryview(self.numbers)
+        try:
+            for start in range(0, len(view), n):
+                yield view[start:start + n]
+        finally:
+            view.release()
+
+
+def benchmark(size=10_000_000):
+    """Old pop(0) loop vs the index iterator and batches, for growing sizes."""
+    import time
+
+    def timed(run):
+        start = time.perf_counter()
+        run()
+        return time.perf_counter() - start
+
+    def pop_loop(numbers):
+        while numbers:
+            numbers.pop(0)
+
+    for n in (50_000, 100_000, 200_000):
+        print(f"pop(0) loop, {n:>10,} numbers: {timed(lambda: pop_loop(list(range(n)))):.2f}s")
+
+    collection = NumberCollection(range(size))
+    print(f"iterator,    {size:>10,} numbers: {timed(lambda: sum(collection)):.2f}s")
+    print(f"reversed,    {size:>10,} numbers: {timed(lambda: sum(collection.reverse_iter())):.2f}s")
+    print(f"batches,     {size:>10,} numbers: "
+          f"{timed(lambda: sum(sum(batch) for batch in collection.iter_batches(65536))):.2f}s")
+
+
+if __name__ == '__main__':
+    benchmark()
@@ -0,0 +1,35 @@
+from array import array
+
+import pytest
+
+from number_collection import NumberCollection
+
+
+def test_iteration_is_repeatable_and_batches_share_memory():
+    collection = NumberCollection(range(10))
+
+    assert list(collection) == list(range(10))
+    assert list(collection.reverse_iter()) == list(range(9, -1, -1))
+    assert list(reversed(collection)) == list(collection.reverse_iter())
+    assert len(collection) == 10  # nothing was consumed
+
+    batches = list(batch.tolist() for batch in collection.iter_batches(4))
+    assert batches == [[0, 1, 2, 3], [4, 5, 6, 7], [8, 9]]
+    for batch in collection.iter_batches(4):
+        batch[0] = -1  # writes go straight to the array
+    assert collection[:] == array('q', [-1, 1, 2, 3, -1, 5, 6, 7, -1, 9])
+
+    assert NumberCollection([1, 2.5]).numbers.typecode == 'd'
+
+
+def test_batches_stay_valid_after_the_generator_moves_on():
+    collection = NumberCollection(range(5))
+    batches = list(collection.iter_batches(2))
+    assert [batch.tolist() for batch in batches] == [[0, 1], [2, 3], [4]]
+
+    with pytest.raises(BufferError):
+        collection.append(5)  # the batches still point into the array
+    for batch in batches:
+        batch.release()
+    collection.append(5)
+    assert len(collection) == 6
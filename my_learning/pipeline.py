@@ -0,0 +1,252 @@
+"""
+Lazy, chainable pipelines over generators such as count_up_to() and infinite_sequence() in
+07_generators.py, or lines_from_file() in 08_files.py.
+
+    Pipeline(lines_from_file(path)).map(str.split).filter(None).map(len).batch(100)
+
+Nothing runs until the pipeline is iterated, and items flow through one at a time, so an
+infinite source is fine as long as something like take() stops it.
+- Adjacent map/filter stages are fused into one generator, compiled once per shape of the
+  run (e.g. map, filter, map). Each item then resumes one generator frame instead of one
+  per stage.
+- parallel_map() sends chunks of items to a process pool. It keeps only a few chunks in
+  flight and yields the results in input order.
+- Pipeline(..., profile=True) counts the items every stage produced and the time spent in
+  it, excluding the stages before it: see stats / report(). The timing itself costs two
+  clock reads per item and stage, so profile to find the slow stage, not for production.
+"""
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from itertools import islice, tee
+
+
+@lru_cache(maxsize=None)
+def _fused(kinds):
+    """A generator function applying a run of map/filter stages in a single loop."""
+    params = [f"f{i}" for i in range(len(kinds))]
+    body = []
+    for kind, fn in zip(kinds, params):
+        if kind == 'map':
+            body.append(f"        item = {fn}(item)")
+        else:
+            body.append(f"        if not {fn}(item):\n            continue")
+    source = (f"def fused(source, {', '.join(params)}):\n"
+              f"    for item in source:\n" + '\n'.join(body) + "\n        yield item\n")
+    namespace = {}
+    exec(source, namespace)
+    return namespace['fused']
+
+
+def _batch(iterator, n):
+    while batch := list(islice(iterator, n)):
+        yield batch
+
+
+def _window(iterator, n, step):
+    window = deque(islice(iterator, n), maxlen=n)
+    if len(window) < n:
+        return
+    yield tuple(window)
+    while True:
+        added = 0
+        for item in islice(iterator, step):
+            window.append(item)
+            added += 1
+        if added < step:
+            return
+        yield tuple(window)
+
+
+def _map_chunk(fn, chunk):
+    return [fn(item) for item in chunk]
+
+
+def _parallel_map(iterator, fn, workers, chunksize, executor):
+    """Ordered map over a process pool with at most 2 * workers chunks in flight."""
+    own = executor is None
+    if own:
+        executor = ProcessPoolExecutor(max_workers=workers)
+    workers = workers or os.cpu_count() or 1
+    pending = deque()
+    try:
+        for chunk in _batch(iterator, chunksize):
+            pending.append(executor.submit(_map_chunk, fn, chunk))
+            if len(pending) >= 2 * workers:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
+    finally:
+        for future in pending:
+            future.cancel()
+        if own:
+            executor.shutdown(cancel_futures=True)
+
+
+class StageStats:
+    def __init__(self, name, upstream=None):
+        self.name = name
+        self.upstream = upstream
+        self.items = 0
+        self.total_ns = 0  # time spent producing this stage's items, upstream stages included
+
+    @property
+    def seconds(self):
+        """Time spent in this stage alone."""
+        upstream_ns = self.upstream.total_ns if self.upstream else 0
+        return (self.total_ns - upstream_ns) / 1e9
+
+    @property
+    def rate(self):
+        return self.items / self.seconds if self.seconds else float('inf')
+
+    def __repr__(self):
+        return f"StageStats({self.name!r}, items={self.items}, seconds={self.seconds:.4f})"
+
+
+def _timed(iterator, stats):
+    clock = time.perf_counter_ns
+    while True:
+        start = clock()
+        try:
+            item = next(iterator)
+        except StopIteration:
+            stats.total_ns += clock() - start
+            return
+        stats.total_ns += clock() - start
+        stats.items += 1
+        yield item
+
+
+class Pipeline:
+    """A source iterable plus a list of stages; every method returns a new, longer pipeline."""
+
+    def __init__(self, source, profile=False, _stages=()):
+        self.source = source
+        self.profile = profile
+        self.stages = list(_stages)
+        self.stats = []
+
+    def _then(self, kind, *args):
+        return Pipeline(self.source, self.profile, self.stages + [(kind, args)])
+
+    def map(self, fn):
+        return self._then('map', fn)
+
+    def filter(self, predicate=None):
+        return self._then('filter', predicate or bool)
+
+    def batch(self, n):
+        """Lists of n items (the last one may be shorter)."""
+        return self._then('batch', n)
+
+    def window(self, n, step=1):
+        """Tuples of n consecutive items, moving `step` items at a time."""
+        return self._then('window', n, step)
+
+    def take(self, n):
+        return self._then('take', n)
+
+    def parallel_map(self, fn, workers=None, chunksize=1000, executor=None):
+        """Like map(), across processes; fn and the items must be picklable."""
+        return self._then('parallel_map', fn, workers, chunksize, executor)
+
+    def tee(self, n=2):
+        """Split into n independent pipelines over the same items."""
+        return tuple(Pipeline(branch, self.profile) for branch in tee(iter(self), n))
+
+    def _plan(self):
+        """Stages with each run of map/filter merged into one 'fused' stage."""
+        plan = []
+        for kind, args in self.stages:
+            if kind in ('map', 'filter'):
+                if plan and plan[-1][0] == 'fused':
+                    plan[-1][1].append((kind, args[0]))
+                else:
+                    plan.append(('fused', [(kind, args[0])]))
+            else:
+                plan.append((kind, args))
+        return plan
+
+    def _build(self, kind, args, iterator):
+        if kind == 'fused':
+            kinds, fns = zip(*args)
+            if kinds == ('map',):
+                return map(fns[0], iterator)
+            if kinds == ('filter',):
+                return filter(fns[0], iterator)
+            return _fused(kinds)(iterator, *fns)
+        if kind == 'batch':
+            return _batch(iterator, *args)
+        if kind == 'window':
+            return _window(iterator, *args)
+        if kind == 'take':
+            return islice(iterator, *args)
+        return _parallel_map(iterator, *args)
+
+    def __iter__(self):
+        iterator = iter(self.source)
+        self.stats = []
+        if self.profile:
+            self.stats.append(StageStats('source'))
+            iterator = _timed(iterator, self.stats[-1])
+        for kind, args in self._plan():
+            iterator = self._build(kind, args, iterator)
+            if self.profile:
+                name = '+'.join(k for k, _ in args) if kind == 'fused' else kind
+                self.stats.append(StageStats(name, self.stats[-1]))
+                iterator = _timed(iterator, self.stats[-1])
+        return iterator
+
+    def to_list(self):
+        return list(self)
+
+    def report(self):
+        """One line per stage: items produced, own time, items per second."""
+        return '\n'.join(f"{stats.name:>20}: {stats.items:>10} items {stats.seconds:8.3f}s "
+                         f"{stats.rate:>14,.0f}/s" for stats in self.stats)
+
+
+def _slow_square(x):
+    return sum(x * x for _ in range(200)) // 200
+
+
+def benchmark(size=2_000_000):
+    """Chained generator stages vs the fused pipeline, and map vs parallel_map."""
+    def map_stage(fn, items):
+        for item in items:
+            yield fn(item)
+
+    def filter_stage(fn, items):
+        for item in items:
+            if fn(item):
+                yield item
+
+    inc, odd, double = (lambda x: x + 1), (lambda x: x % 2), (lambda x: x * 2)
+
+    start = time.perf_counter()
+    expected = sum(map_stage(double, filter_stage(odd, map_stage(inc, range(size)))))
+    chained = time.perf_counter() - start
+    start = time.perf_counter()
+    assert sum(Pipeline(range(size)).map(inc).filter(odd).map(double)) == expected
+    fused = time.perf_counter() - start
+    print(f"map/filter/map over {size:,} items: generator stages {chained:.2f}s, fused {fused:.2f}s")
+
+    pipeline = Pipeline(range(size), profile=True).map(inc).filter(odd).batch(1000).map(sum)
+    sum(pipeline)
+    print(pipeline.report())
+
+    items = range(20_000)
+    start = time.perf_counter()
+    serial = Pipeline(items).map(_slow_square).to_list()
+    serial_time = time.perf_counter() - start
+    start = time.perf_counter()
+    assert Pipeline(items).parallel_map(_slow_square, chunksize=500).to_list() == serial
+    print(f"{len(items)} slow items: map {serial_time:.2f}s, "
+          f"parallel_map ({os.cpu_count()} CPUs) {time.perf_counter() - start:.2f}s")
+
+
+if __name__ == '__main__':
+    benchmark()
@@ -0,0 +1,26 @@
+from concurrent.futures import ThreadPoolExecutor
+from itertools import count
+
+from pipeline import Pipeline
+
+
+def test_fused_stages_match_plain_generators_and_count_items():
+    pipeline = Pipeline(count(1), profile=True).map(lambda x: x + 1).filter(lambda x: x % 3).map(str).take(5)
+
+    assert pipeline.to_list() == ['2', '4', '5', '7', '8']
+    assert [stats.name for stats in pipeline.stats] == ['source', 'map+filter+map', 'take']
+    assert [stats.items for stats in pipeline.stats] == [7, 5, 5]
+    assert all(stats.seconds >= 0 for stats in pipeline.stats)
+
+    assert Pipeline(range(7)).window(3, step=2).to_list() == [(0, 1, 2), (2, 3, 4), (4, 5, 6)]
+    assert Pipeline(range(5)).batch(2).to_list() == [[0, 1], [2, 3], [4]]
+    evens, odds = Pipeline(range(6)).tee()
+    assert evens.filter(lambda x: x % 2 == 0).to_list() == [0, 2, 4]
+    assert odds.filter(lambda x: x % 2).to_list() == [1, 3, 5]
+
+
+def test_parallel_map_keeps_input_order():
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        result = Pipeline(range(1000)).parallel_map(abs, chunksize=7, executor=executor).map(str).to_list()
+    assert result == [str(x) for x in range(1000)]
+    assert Pipeline(range(-50, 50)).parallel_map(abs, workers=2, chunksize=9).to_list() == [abs(x) for x in range(-50, 50)]
@@ -0,0 +1,255 @@
+"""
+Indexed storage for the Student records of 00_basics.py.
+
+00_basics.py answers "students by GPA" with sorted() and "students in a major" with a scan
+over every record. On a roster of millions, each of those queries costs O(n log n) or O(n).
+StudentTable instead:
+- stores the students as columns: a list of names, an array('d') of GPAs and an array of
+  small major codes. A row is one position in those columns, not an object per student
+- keeps a sorted GPA index as a list of buckets of at most 2 * BUCKET_SIZE entries. A
+  bisect over the bucket maxima finds the bucket, a bisect inside it finds the position, so
+  an insert moves at most one bucket instead of the whole index
+- keeps a hash index from major to the rows in that major, in insertion order
+Range and top-k queries walk the GPA index from the first match. Queries on major and GPA
+together scan whichever of the two candidate sets is smaller.
+"""
+import heapq
+from array import array
+from bisect import bisect_left, bisect_right
+from itertools import islice
+
+BUCKET_SIZE = 1000
+
+
+class Student:
+    __slots__ = ('name', 'gpa', 'major')
+
+    def __init__(self, name, gpa, major):
+        self.name = name
+        self.gpa = gpa
+        self.major = major
+
+    def __repr__(self):
+        return f"Student({self.name!r}, {self.gpa!r}, {self.major!r})"
+
+
+class SortedIndex:
+    """Row numbers ordered by key (ties in insertion order), in bisectable buckets."""
+
+    def __init__(self):
+        self._keys = []  # buckets of sorted keys
+        self._rows = []  # the matching row numbers
+        self._maxes = []  # largest key of every bucket
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    def build(self, keys):
+        """Index rows 0..len(keys)-1 at once, with a single sort."""
+        order = sorted(range(len(keys)), key=keys.__getitem__)
+        self._keys, self._rows, self._maxes = [], [], []
+        for start in range(0, len(order), BUCKET_SIZE):
+            rows = order[start:start + BUCKET_SIZE]
+            self._rows.append(array('I', rows))
+            self._keys.append(array('d', (keys[row] for row in rows)))
+            self._maxes.append(self._keys[-1][-1])
+        self._size = len(order)
+
+    def insert(self, key, row):
+        if not self._maxes:
+            self._keys.append(array('d', [key]))
+            self._rows.append(array('I', [row]))
+            self._maxes.append(key)
+            self._size = 1
+            return
+        b = min(bisect_right(self._maxes, key), len(self._maxes) - 1)
+        keys, rows = self._keys[b], self._rows[b]
+        i = bisect_right(keys, key)
+        keys.insert(i, key)
+        rows.insert(i, row)
+        self._maxes[b] = keys[-1]
+        self._size += 1
+        if len(keys) > 2 * BUCKET_SIZE:  # split it in two
+            self._keys[b:b + 1] = [keys[:BUCKET_SIZE], keys[BUCKET_SIZE:]]
+            self._rows[b:b + 1] = [rows[:BUCKET_SIZE], rows[BUCKET_SIZE:]]
+            self._maxes[b:b + 1] = [keys[BUCKET_SIZE - 1], keys[-1]]
+
+    def _position(self, key, right):
+        """(bucket, index) of the first key > key (right) or >= key (left)."""
+        find = bisect_right if right else bisect_left
+        b = find(self._maxes, key)
+        if b == len(self._maxes):
+            return b, 0
+        return b, find(self._keys[b], key)
+
+    def range(self, low=None, high=None):
+        """Rows with low <= key <= high, by ascending key."""
+        b, i = (0, 0) if low is None else self._position(low, right=False)
+        end = (len(self._keys), 0) if high is None else self._position(high, right=True)
+        while (b, i) < end:
+            stop = end[1] if b == end[0] else len(self._rows[b])
+            yield from islice(self._rows[b], i, stop)
+            b, i = b + 1, 0
+
+    def count(self, low=None, high=None):
+        b, i = (0, 0) if low is None else self._position(low, right=False)
+        end_b, end_i = (len(self._keys), 0) if high is None else self._position(high, right=True)
+        return sum(len(rows) for rows in self._rows[b:end_b]) - i + end_i
+
+    def descending(self):
+        for rows in reversed(self._rows):
+            yield from reversed(rows)
+
+
+class StudentTable:
+    """Students stored as columns, with a sorted GPA index and a major -> rows index."""
+
+    def __init__(self, students=()):
+        self.names = []
+        self.gpas = array('d')
+        self.majors = array('H')  # code of the major, see major_names
+        self.major_names = []
+        self._major_codes = {}
+        self._by_major = {}  # major code -> array of rows
+        self._by_gpa = SortedIndex()
+        self.extend(students)
+
+    def __len__(self):
+        return len(self.names)
+
+    def __getitem__(self, row):
+        return Student(self.names[row], self.gpas[row], self.major_names[self.majors[row]])
+
+    def __iter__(self):
+        return (self[row] for row in range(len(self)))
+
+    def _major_code(self, major):
+        code = self._major_codes.get(major)
+        if code is None:
+            code = self._major_codes[major] = len(self.major_names)
+            self.major_names.append(major)
+            self._by_major[code] = array('I')
+        return code
+
+    def _append(self, name, gpa, major):
+        row = len(self.names)
+        code = self._major_code(major)
+        self.names.append(name)
+        self.gpas.append(gpa)
+        self.majors.append(code)
+        self._by_major[code].append(row)
+        return row
+
+    def insert(self, name, gpa, major):
+        """Add one student and update both indexes. Returns its row number."""
+        row = self._append(name, gpa, major)
+        self._by_gpa.insert(float(gpa), row)
+        return row
+
+    def extend(self, students):
+        """Add many students (Student objects or (name, gpa, major) tuples)."""
+        start = len(self)
+        for student in students:
+            if isinstance(student, tuple):
+                self._append(*student)
+            else:
+                self._append(student.name, student.gpa, student.major)
+        added = len(self) - start
+        if added > start:  # more new rows than old ones: one sort beats many inserts
+            self._by_gpa.build(self.gpas)
+        else:
+            for row in range(start, len(self)):
+                self._by_gpa.insert(self.gpas[row], row)
+
+    def by_gpa(self, low=None, high=None):
+        """Students with low <= gpa <= high, lowest GPA first."""
+        return (self[row] for row in self._by_gpa.range(low, high))
+
+    def top(self, k, major=None):
+        """The k students with the highest GPA (optionally within one major)."""
+        rows = self._by_gpa.descending()
+        if major is not None:
+            code = self._major_codes.get(major)
+            rows = (row for row in rows if self.majors[row] == code)
+        return [self[row] for row in islice(rows, k)]
+
+    def with_major(self, major):
+        code = self._major_codes.get(major)
+        return (self[row] for row in self._by_major.get(code, ()))
+
+    def query(self, major=None, min_gpa=None, max_gpa=None):
+        """Students matching every given condition, lowest GPA first."""
+        return [self[row] for row in self.query_rows(major, min_gpa, max_gpa)]
+
+    def query_rows(self, major=None, min_gpa=None, max_gpa=None):
+        """Like query(), as row numbers: no Student objects are created."""
+        if major is None:
+            return [*self._by_gpa.range(min_gpa, max_gpa)]
+        code = self._major_codes.get(major)
+        if code is None:
+            return []
+        major_rows = self._by_major[code]
+        if self._by_gpa.count(min_gpa, max_gpa) <= len(major_rows):
+            rows = [row for row in self._by_gpa.range(min_gpa, max_gpa) if self.majors[row] == code]
+        else:
+            low = float('-inf') if min_gpa is None else min_gpa
+            high = float('inf') if max_gpa is None else max_gpa
+            gpas = self.gpas
+            rows = [row for row in major_rows if low <= gpas[row] <= high]
+            rows.sort(key=gpas.__getitem__)
+        return rows
+
+
+def benchmark(size=1_000_000, queries=20, seed=0):
+    """Sort and scan on every query vs the indexed table, for "cs students with gpa >= 3"."""
+    import random
+    import time
+
+    rng = random.Random(seed)
+    majors = ['cs', 'eng', 'med', 'law', 'art', 'bio', 'math', 'phys']
+    rows = [(f"s{i}", round(rng.uniform(0, 4), 2), rng.choice(majors)) for i in range(size)]
+    students = [Student(*row) for row in rows]
+
+    start = time.perf_counter()
+    for _ in range(queries):
+        expected = [s for s in sorted(students, key=lambda s: s.gpa) if s.major == 'cs' and s.gpa >= 3]
+    naive = (time.perf_counter() - start) / queries
+
+    start = time.perf_counter()
+    table = StudentTable(rows)
+    build = time.perf_counter() - start
+    start = time.perf_counter()
+    for _ in range(queries):
+        found = table.query('cs', min_gpa=3)
+    indexed = (time.perf_counter() - start) / queries
+    start = time.perf_counter()
+    for _ in range(queries):
+        table.query_rows('cs', min_gpa=3)
+    indexed_rows = (time.perf_counter() - start) / queries
+    assert [s.name for s in found] == [s.name for s in expected]
+
+    start = time.perf_counter()
+    for _ in range(queries):
+        heapq.nlargest(10, students, key=lambda s: s.gpa)
+    naive_top = (time.perf_counter() - start) / queries
+    start = time.perf_counter()
+    for _ in range(queries):
+        table.top(10)
+    indexed_top = (time.perf_counter() - start) / queries
+
+    inserts = 100_000
+    start = time.perf_counter()
+    for i in range(inserts):
+        table.insert(f"n{i}", rng.uniform(0, 4), rng.choice(majors))
+    insert_rate = inserts / (time.perf_counter() - start)
+
+    print(f"{size:,} students, built in {build:.2f}s")
+    print(f"cs with gpa >= 3 ({len(found):,} rows): sort + scan {naive * 1000:.0f} ms, "
+          f"indexed {indexed * 1000:.0f} ms, as row numbers {indexed_rows * 1000:.0f} ms")
+    print(f"top 10 by gpa: heap over all {naive_top * 1000:.0f} ms, indexed {indexed_top * 1000:.3f} ms")
+    print(f"incremental inserts: {insert_rate:,.0f}/s")
+
+
+if __name__ == '__main__':
+    benchmark()
@@ -0,0 +1,26 @@
+import random
+
+import student_table
+from student_table import StudentTable
+
+
+def test_indexes_answer_like_a_sort_and_scan(monkeypatch):
+    monkeypatch.setattr(student_table, 'BUCKET_SIZE', 4)  # force many buckets and splits
+    rng = random.Random(1)
+    majors = ['cs', 'eng', 'med']
+    rows = [(f"s{i}", rng.choice([1.0, 2.5, 3.0, 3.5, 4.0]), rng.choice(majors)) for i in range(60)]
+    table = StudentTable(rows[:30])  # bulk build
+    for row in rows[30:]:
+        table.insert(*row)  # incremental
+    by_gpa = sorted(range(len(rows)), key=lambda i: rows[i][1])  # stable: ties by row
+
+    assert [s.name for s in table.by_gpa()] == [rows[i][0] for i in by_gpa]
+    assert [s.name for s in table.by_gpa(2.5, 3.0)] == [rows[i][0] for i in by_gpa if 2.5 <= rows[i][1] <= 3.0]
+    for major in majors:
+        for low, high in [(3.0, None), (None, 2.5), (1.0, 4.0), (5.0, None)]:
+            expected = [i for i in by_gpa if rows[i][2] == major
+                        and (low is None or rows[i][1] >= low) and (high is None or rows[i][1] <= high)]
+            assert table.query_rows(major, low, high) == expected
+    assert [s.gpa for s in table.top(5)] == sorted((row[1] for row in rows), reverse=True)[:5]
+    assert all(s.major == 'med' for s in table.top(3, major='med'))
+    assert table.query('law') == [] and len(table) == 60
@@ -0,0 +1,68 @@
+import asyncio
+
+from title_extractor import NOT_FOUND, HeadScanner, TitleStage, extract_title, fast_title
+
+
+def feed_in_chunks(page, size, max_bytes=64 * 1024):
+    scanner = HeadScanner(max_bytes)
+    chunks = 0
+    for start in range(0, len(page), size):
+        chunks += 1
+        if scanner.feed(page[start:start + size]):
+            break
+    return scanner, chunks
+
+
+def test_title_split_across_chunks_is_unescaped():
+    page = b"<html><HEAD><Title lang='en'>Fish &amp;\n  Chips</title></head><body>" + b'x' * 1000
+    for size in (1, 3, 7, 64):
+        scanner, chunks = feed_in_chunks(page, size)
+        assert scanner.title == 'Fish & Chips'
+        assert chunks * size < 100  # the body was never read
+
+
+def test_charset_comes_from_meta():
+    page = "<head><meta charset='iso-8859-1'><title>Café</title></head>".encode('iso-8859-1')
+    assert fast_title(page) == 'Café'
+    unknown = "<head><meta charset=nonsense><title>Café</title></head>".encode('utf-8')
+    assert fast_title(unknown) == 'Café'
+
+
+def test_str_pages_are_not_decoded_again():
+    page = '<meta charset="iso-8859-1"><title>Café</title>'  # as read_stream returns it
+    assert extract_title(page) == 'Café'
+    assert extract_title(page.encode('iso-8859-1')) == 'Café'
+
+
+def test_scan_stops_at_head_end_or_byte_cap():
+    scanner, chunks = feed_in_chunks(b"<head></head><body>" + b'<title>late</title>' * 100, 8)
+    assert scanner.done and scanner.title is None
+    assert chunks < 5
+    scanner, chunks = feed_in_chunks(b"<head>" + b'x' * 10_000, 100, max_bytes=1000)
+    assert scanner.done and scanner.title is None
+    assert chunks == 10
+
+
+def test_extract_title_falls_back_to_beautifulsoup():
+    late = "<html><head><!--" + 'x' * 70_000 + "--><title>Late title</title></head></html>"
+    assert fast_title(late) is None
+    assert extract_title(late) == 'Late title'
+    assert extract_title("<html><body>nothing</body></html>") == NOT_FOUND
+
+
+def test_title_stage_returns_every_page():
+    def extract(page):
+        if page == 'broken':
+            raise ValueError("bad page")
+        return extract_title(page)
+
+    async def run():
+        async with TitleStage(workers=2, queue_size=2, extract=extract) as stage:
+            pages = {f"url{i}": f"<title>Page {i}</title>" for i in range(5)}
+            pages['url5'] = 'broken'
+            for url, page in pages.items():
+                await stage.put(url, page)
+            return dict([await stage.get() for _ in pages])
+
+    titles = asyncio.run(run())
+    assert titles == {**{f"url{i}": f"Page {i}" for i in range(5)}, 'url5': 'ValueError: bad page'}
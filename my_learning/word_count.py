@@ -0,0 +1,112 @@
+"""
+Word frequencies for files too big for count_words() in 08_files.py.
+
+count_words() decodes, lowercases and splits one line at a time and updates a dict one word
+at a time. Here:
+- the file is cut into byte ranges that start and end on a newline, one per worker process
+- each worker reads its range in large binary chunks, lowercases and splits a whole chunk at
+  once, and counts the words with Counter.update (a C loop)
+- workers return their partial Counters, which are merged at the end
+- top(k) picks the most frequent words with a heap instead of sorting everything
+
+Words are split on any whitespace, so runs of spaces or tabs do not produce empty "words".
+"""
+import heapq
+import os
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from operator import itemgetter
+
+CHUNK_SIZE = 8 * 1024 * 1024
+MIN_PARALLEL_SIZE = 32 * 1024 * 1024  # smaller files are not worth starting processes for
+
+
+def byte_ranges(path, parts):
+    """Split a file into at most `parts` (start, end) ranges, each ending after a newline."""
+    size = os.path.getsize(path)
+    if size == 0:
+        return []
+    bounds = [0]
+    with open(path, 'rb') as infile:
+        for i in range(1, parts):
+            infile.seek(max(size * i // parts, bounds[-1]))
+            infile.readline()  # move to the start of the next line
+            position = infile.tell()
+            if position >= size:
+                break
+            if position > bounds[-1]:
+                bounds.append(position)
+    bounds.append(size)
+    return list(zip(bounds[:-1], bounds[1:]))
+
+
+def iter_word_chunks(path, start, end, chunk_size=CHUNK_SIZE):
+    """Yield lists of lowercased byte-string words, one list per chunk of the range."""
+    with open(path, 'rb') as infile:
+        infile.seek(start)
+        remaining = end - start
+        carry = b''
+        while remaining > 0:
+            chunk = infile.read(min(chunk_size, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            chunk = carry + chunk
+            cut = max(chunk.rfind(b'\n'), chunk.rfind(b' ')) if remaining > 0 else len(chunk)
+            if cut < 0:  # no whitespace at all: keep reading
+                carry = chunk
+                continue
+            carry = chunk[cut:]
+            yield chunk[:cut].lower().split()
+        if carry:
+            yield carry.lower().split()
+
+
+def count_range(path, start, end, chunk_size=CHUNK_SIZE):
+    """Counter of lowercased byte-string words between two newline-aligned offsets."""
+    counts = Counter()
+    for words in iter_word_chunks(path, start, end, chunk_size):
+        counts.update(words)
+    return counts
+
+
+def merge(partials):
+    """Add partial Counters and turn byte words into lowercase text."""
+    total = Counter()
+    for partial in partials:
+        total.update(partial)
+    words = Counter()
+    for word, count in total.items():
+        words[word.decode('utf-8', errors='replace').lower()] += count
+    return words
+
+
+def count_words(path, workers=None, chunk_size=CHUNK_SIZE):
+    """Counter of every word in a file, counted across a process pool for large files."""
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or os.path.getsize(path) < MIN_PARALLEL_SIZE:
+        return merge([count_range(path, 0, os.path.getsize(path), chunk_size)])
+
+    ranges = byte_ranges(path, workers)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        partials = executor.map(count_range, [path] * len(ranges), *zip(*ranges),
+                                [chunk_size] * len(ranges))
+        return merge(partials)
+
+
+def top(counts, k=10):
+    """The k most frequent (word, count) pairs, found with a heap in O(n log k)."""
+    return heapq.nlargest(k, counts.items(), key=itemgetter(1))
+
+
+if __name__ == '__main__':
+    import sys
+    import time
+
+    path = sys.argv[1] if len(sys.argv) > 1 else 'pi_digits.text'
+    start = time.perf_counter()
+    counts = count_words(path)
+    elapsed = time.perf_counter() - start
+    print(f"{sum(counts.values())} words, {len(counts)} distinct, in {elapsed:.2f}s")
+    for word, count in top(counts, 10):
+        print(f"{word}: {count}")
@@ -0,0 +1,19 @@
+from collections import Counter
+
+import word_count
+
+
+def test_ranges_and_chunks_count_like_a_plain_split(tmp_path, monkeypatch):
+    text = '\n'.join(' '.join(['Alpha', 'beta  BETA', 'Été', 'été'][:n % 5]) for n in range(2000))
+    path = tmp_path / 'words.txt'
+    path.write_text(text, encoding='utf-8')
+    expected = Counter(word.lower() for word in text.split())
+
+    ranges = word_count.byte_ranges(path, 4)
+    assert ranges[0][0] == 0 and ranges[-1][1] == path.stat().st_size
+    assert word_count.merge(word_count.count_range(path, start, end, 7) for start, end in ranges) == expected
+
+    monkeypatch.setattr(word_count, 'MIN_PARALLEL_SIZE', 0)
+    counts = word_count.count_words(path, workers=2)
+    assert counts == expected
+    assert word_count.top(counts, 2) == expected.most_common(2)
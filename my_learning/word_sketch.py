@@ -0,0 +1,289 @@
+"""
+Approximate word statistics in fixed memory, for vocabularies too big for an exact dict.
+
+- CountMinSketch: `depth` rows of `width` counters. A word adds its count to one counter per
+  row and its estimate is the smallest of those counters. It never underestimates, and
+  overestimates by at most epsilon * total words with probability 1 - delta.
+- HyperLogLog: 2**p one-byte registers remembering the longest run of leading zero bits seen
+  in the hashes; estimates the number of distinct words within about 1.04 / sqrt(2**p).
+- WordSketch: both of the above, plus a short list of heavy hitter candidates.
+
+Everything is mergeable: sketches built from different files or worker processes combine as
+if one sketch had seen all the words, as long as they were created with the same settings.
+Words are hashed with blake2b rather than hash(), which is salted per process.
+
+Each chunk of words is first collapsed with a Counter (a C loop), so only distinct words are
+case-folded and hashed, and the counter updates are done with NumPy. Words are counted as
+lowercase text, like word_count.merge() does, so 'Été' and 'ÉTÉ' are one word in both modes
+(bytes.lower() alone only folds ASCII).
+"""
+import hashlib
+import heapq
+import math
+import os
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+import word_count
+
+
+def hash64(words):
+    """Stable 64-bit hashes of byte strings, as a uint64 array."""
+    return np.fromiter(
+        (int.from_bytes(hashlib.blake2b(word, digest_size=8).digest(), 'little') for word in words),
+        dtype=np.uint64, count=len(words),
+    )
+
+
+class CountMinSketch:
+    """Frequency estimates with error <= epsilon * total, with probability 1 - delta."""
+
+    def __init__(self, epsilon=1e-4, delta=1e-3, width=None, depth=None):
+        self.width = width or math.ceil(math.e / epsilon)
+        self.depth = depth or math.ceil(math.log(1 / delta))
+        self.table = np.zeros((self.depth, self.width), dtype=np.uint64)
+        self.total = 0
+
+    @classmethod
+    def from_memory(cls, max_bytes, depth=5):
+        """The widest sketch of `depth` rows that fits in `max_bytes`."""
+        return cls(width=max(1, max_bytes // (8 * depth)), depth=depth)
+
+    @property
+    def epsilon(self):
+        return math.e / self.width
+
+    @property
+    def nbytes(self):
+        return self.table.nbytes
+
+    def _columns(self, hashes):
+        """Column of every hash in every row, by double hashing: h1 + i * h2."""
+        h1 = hashes & np.uint64(0xFFFFFFFF)
+        h2 = (hashes >> np.uint64(32)) | np.uint64(1)
+        rows = np.arange(self.depth, dtype=np.uint64)[:, None]
+        return ((h1 + rows * h2) % np.uint64(self.width)).astype(np.int64)
+
+    def add_hashed(self, hashes, counts):
+        counts = np.asarray(counts, dtype=np.uint64)
+        columns = self._columns(hashes)
+        for row in range(self.depth):
+            np.add.at(self.table[row], columns[row], counts)
+        self.total += int(counts.sum())
+
+    def estimate_hashed(self, hashes):
+        columns = self._columns(hashes)
+        return self.table[np.arange(self.depth)[:, None], columns].min(axis=0)
+
+    def estimate(self, word):
+        return int(self.estimate_hashed(hash64([_bytes(word)]))[0])
+
+    def merge(self, other):
+        if (self.width, self.depth) != (other.width, other.depth):
+            raise ValueError("Only sketches with the same width and depth can be merged")
+        self.table += other.table
+        self.total += other.total
+        return self
+
+
+class HyperLogLog:
+    """Distinct count estimate with relative error about 1.04 / sqrt(2**precision)."""
+
+    def __init__(self, error_rate=0.01, precision=None):
+        if precision is None:
+            precision = math.ceil(math.log2((1.04 / error_rate) ** 2))
+        self.precision = min(18, max(4, precision))
+        self.registers = np.zeros(1 << self.precision, dtype=np.uint8)
+
+    @property
+    def nbytes(self):
+        return self.registers.nbytes
+
+    def add_hashed(self, hashes):
+        p = np.uint64(self.precision)
+        index = (hashes >> (np.uint64(64) - p)).astype(np.int64)
+        rest = hashes & ((np.uint64(1) << (np.uint64(64) - p)) - np.uint64(1))
+        rank = (64 - self.precision) - _bit_length(rest) + 1
+        np.maximum.at(self.registers, index, rank.astype(np.uint8))
+
+    def __len__(self):
+        return round(self.estimate())
+
+    def estimate(self):
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        raw = alpha * m * m / np.sum(np.ldexp(1.0, -self.registers.astype(np.int64)))
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if raw <= 2.5 * m and zeros:
+            return m * math.log(m / zeros)  # linear counting for small cardinalities
+        return float(raw)
+
+    def merge(self, other):
+        if self.precision != other.precision:
+            raise ValueError("Only HyperLogLogs with the same precision can be merged")
+        np.maximum(self.registers, other.registers, out=self.registers)
+        return self
+
+
+def _bit_length(values):
+    """Vectorized int.bit_length() for uint64 (exact: each 32-bit half fits a float)."""
+    high = (values >> np.uint64(32)).astype(np.float64)
+    low = (values & np.uint64(0xFFFFFFFF)).astype(np.float64)
+    with np.errstate(divide='ignore'):
+        high_bits = np.where(high > 0, np.floor(np.log2(high)) + 33, 0)
+        low_bits = np.where(low > 0, np.floor(np.log2(low)) + 1, 0)
+    return np.where(high > 0, high_bits, low_bits).astype(np.int64)
+
+
+def _bytes(word):
+    """The key a word is counted under: lowercase text, as UTF-8."""
+    if isinstance(word, bytes):
+        if word.isascii():
+            return word.lower()
+        word = word.decode('utf-8', errors='replace')
+    return word.lower().encode('utf-8')
+
+
+class WordSketch:
+    """Approximate frequencies, heavy hitters and distinct count of a stream of words."""
+
+    def __init__(self, epsilon=1e-4, delta=1e-3, error_rate=0.01, heavy_hitters=100, max_bytes=None):
+        if max_bytes is not None:
+            self.frequencies = CountMinSketch.from_memory(max_bytes)
+        else:
+            self.frequencies = CountMinSketch(epsilon, delta)
+        self.distinct = HyperLogLog(error_rate)
+        self.k = heavy_hitters
+        self.candidates = {}  # word -> estimated count, at most 2k entries
+
+    @property
+    def nbytes(self):
+        return self.frequencies.nbytes + self.distinct.nbytes
+
+    @property
+    def total(self):
+        return self.frequencies.total
+
+    def update(self, words):
+        """Add a batch of words (bytes or str)."""
+        counts = Counter()
+        for word, count in Counter(words).items():
+            counts[_bytes(word)] += count
+        if not counts:
+            return self
+        distinct = list(counts)
+        hashes = hash64(distinct)
+        self.frequencies.add_hashed(hashes, list(counts.values()))
+        self.distinct.add_hashed(hashes)
+        self._offer(distinct, self.frequencies.estimate_hashed(hashes))
+        return self
+
+    def _offer(self, words, estimates):
+        """Keep the words with the largest estimates as heavy hitter candidates."""
+        if len(words) > self.k:
+            best = np.argpartition(estimates, -self.k)[-self.k:]
+            words, estimates = [words[i] for i in best], estimates[best]
+        for word, estimate in zip(words, estimates.tolist()):
+            self.candidates[word] = estimate
+        if len(self.candidates) > 2 * self.k:
+            self.candidates = dict(heapq.nlargest(self.k, self.candidates.items(), key=lambda item: item[1]))
+
+    def estimate(self, word):
+        return self.frequencies.estimate(word)
+
+    def heavy_hitters(self, k=None):
+        """The k (estimated) most frequent words, as (word, estimated count)."""
+        words = list(self.candidates)
+        if not words:
+            return []
+        estimates = self.frequencies.estimate_hashed(hash64(words)).tolist()
+        top = heapq.nlargest(k or self.k, zip(words, estimates), key=lambda item: item[1])
+        return [(word.decode('utf-8', errors='replace'), count) for word, count in top]
+
+    def distinct_count(self):
+        return len(self.distinct)
+
+    def merge(self, other):
+        self.frequencies.merge(other.frequencies)
+        self.distinct.merge(other.distinct)
+        words = list(set(self.candidates) | set(other.candidates))
+        self.candidates = {}
+        if words:
+            self._offer(words, self.frequencies.estimate_hashed(hash64(words)))
+        return self
+
+
+def sketch_range(path, start, end, options):
+    sketch = WordSketch(**options)
+    for words in word_count.iter_word_chunks(path, start, end):
+        sketch.update(words)
+    return sketch
+
+
+def sketch_file(path, workers=None, **options):
+    """WordSketch of a whole file, ranges sketched in a process pool and then merged."""
+    workers = workers or os.cpu_count() or 1
+    size = os.path.getsize(path)
+    if workers == 1 or size < word_count.MIN_PARALLEL_SIZE:
+        return sketch_range(path, 0, size, options)
+
+    ranges = word_count.byte_ranges(path, workers)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        sketches = list(executor.map(sketch_range, [path] * len(ranges), *zip(*ranges),
+                                     [options] * len(ranges)))
+    merged = sketches[0]
+    for sketch in sketches[1:]:
+        merged.merge(sketch)
+    return merged
+
+
+def benchmark(words=3_000_000, vocabulary=5_000_000, seed=0):
+    """Exact Counter versus WordSketch on a Zipf distributed corpus."""
+    import time
+    import tracemalloc
+
+    rng = np.random.default_rng(seed)
+    ids = np.minimum(rng.zipf(1.05, words), vocabulary)
+    corpus = [f"w{i}".encode('ascii') for i in ids.tolist()]
+    batches = [corpus[i:i + 100_000] for i in range(0, len(corpus), 100_000)]
+
+    def run(name, count):
+        tracemalloc.start()
+        start = time.perf_counter()
+        result = count()
+        elapsed = time.perf_counter() - start
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        print(f"{name:>7}: {len(corpus) / elapsed / 1e6:5.2f} M words/s, peak {peak / 1e6:6.1f} MB")
+        return result
+
+    def exact():
+        counts = Counter()
+        for batch in batches:
+            counts.update(batch)
+        return counts
+
+    def approximate():
+        sketch = WordSketch(epsilon=1e-4, delta=1e-3, error_rate=0.01, heavy_hitters=100)
+        for batch in batches:
+            sketch.update(batch)
+        return sketch
+
+    counts = run('exact', exact)
+    sketch = run('sketch', approximate)
+    print(f"sketch size {sketch.nbytes / 1e6:.1f} MB")
+
+    distinct = len(counts)
+    print(f"distinct: exact {distinct}, estimated {sketch.distinct_count()} "
+          f"({abs(sketch.distinct_count() - distinct) / distinct:.2%} off)")
+    top = counts.most_common(100)
+    found = {word for word, _ in sketch.heavy_hitters(100)}
+    errors = [(sketch.estimate(word) - count) / count for word, count in top]
+    print(f"top 100: {sum(word.decode() in found for word, _ in top)} found, "
+          f"max overestimate {max(errors):.3%}, bound {sketch.frequencies.epsilon * len(corpus):.0f} words")
+
+
+if __name__ == '__main__':
+    benchmark()
@@ -0,0 +1,29 @@
+from collections import Counter
+
+import word_count
+from word_sketch import WordSketch, sketch_file
+
+
+def test_merged_sketches_match_a_single_sketch():
+    first = [f"w{i % 700}".encode() for i in range(20000)] + [b'common'] * 3000
+    second = [f"v{i % 300}".encode() for i in range(5000)] + [b'common'] * 2000
+    merged = WordSketch(heavy_hitters=5).update(first).merge(WordSketch(heavy_hitters=5).update(second))
+    single = WordSketch(heavy_hitters=5).update(first + second)
+
+    assert (merged.frequencies.table == single.frequencies.table).all()
+    assert merged.distinct_count() == single.distinct_count()
+    assert abs(merged.distinct_count() - 1001) < 30
+    assert merged.heavy_hitters(1) == [('common', 5000)]
+    assert merged.estimate('W1') >= 29
+
+
+def test_approximate_and_exact_counts_fold_case_alike(tmp_path):
+    path = tmp_path / 'words.txt'
+    path.write_text('Été été ÉTÉ été Alpha alpha\n', encoding='utf-8')
+    exact = word_count.count_words(path, workers=1)
+    sketch = sketch_file(path, workers=1)
+
+    assert exact == Counter({'été': 4, 'alpha': 2})
+    assert sketch.distinct_count() == 2
+    assert sketch.heavy_hitters() == exact.most_common()
+    assert sketch.estimate('ÉTÉ') == 4
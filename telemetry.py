@@ -0,0 +1,199 @@
+"""
+Replaying odometer telemetry into cars.
+
+ElectricCar.update_odemeter_reading prints the battery description on every update, so
+replaying a day of events one print at a time is bound by terminal I/O, not by the updates.
+Battery messages now go to a sink (any callable taking a message; print by default), and:
+- BufferedSink collects messages and writes them in large blocks, or only counts them
+- replay() applies (vehicle_id, mileage) events in batches, sends battery messages to the
+  sink it is given (None: no messages at all) and reports events per second. For a Fleet
+  every batch is one vectorized update_odometers() call.
+"""
+import sys
+import time
+from itertools import chain, islice
+
+import numpy as np
+
+from car import Battery
+from fleet import Fleet
+
+
+class BufferedSink:
+    """Message sink that writes to `stream` every `capacity` messages (stream=None: discard)."""
+
+    def __init__(self, stream=sys.stdout, capacity=10_000):
+        self.stream = stream
+        self.capacity = capacity
+        self.buffer = []
+        self.count = 0
+
+    def __call__(self, message):
+        self.count += 1
+        if self.stream is None:
+            return
+        self.buffer.append(message)
+        if len(self.buffer) >= self.capacity:
+            self.flush()
+
+    def write_many(self, messages, count):
+        """Take `count` messages at once: from a Fleet replay, one message per event."""
+        self.count += count
+        if self.stream is not None:
+            self.buffer.extend(messages)
+            if len(self.buffer) >= self.capacity:
+                self.flush()
+
+    def flush(self):
+        if self.buffer:
+            self.stream.write('\n'.join(self.buffer) + '\n')
+            self.buffer.clear()
+        if self.stream is not None:
+            self.stream.flush()
+
+    def close(self):
+        self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class ReplayStats:
+    def __init__(self):
+        self.events = 0
+        self.batches = 0
+        self.seconds = 0.0
+
+    @property
+    def rate(self):
+        return self.events / self.seconds if self.seconds else 0.0
+
+    def __str__(self):
+        return f"{self.events:,} events in {self.batches:,} batches, {self.seconds:.2f}s ({self.rate:,.0f} events/s)"
+
+
+def iter_batches(events, batch_size):
+    """Lists of events; an (n, 2) array of events is cut into array slices instead."""
+    if isinstance(events, np.ndarray):
+        for start in range(0, len(events), batch_size):
+            yield events[start:start + batch_size]
+        return
+    events = iter(events)
+    while batch := list(islice(events, batch_size)):
+        yield batch
+
+
+def _replay_fleet(fleet, batch, sink):
+    if isinstance(batch, np.ndarray):
+        ids, mileages = batch[:, 0], batch[:, 1]
+    else:
+        flat = np.fromiter(chain.from_iterable(batch), dtype=np.int64, count=2 * len(batch))
+        ids, mileages = flat[0::2], flat[1::2]
+    fleet.update_odometers(ids, mileages)
+    if sink is None:
+        return
+    sizes = fleet.column('battery_size')[ids[fleet.column('electric')[ids]]]
+    descriptions = {size: Battery(size).description() for size in np.unique(sizes).tolist()}
+    messages = map(descriptions.__getitem__, sizes.tolist())
+    if isinstance(sink, BufferedSink):
+        sink.write_many(messages, len(sizes))
+    else:
+        for message in messages:
+            sink(message)
+
+
+def _replay_cars(cars, batch):
+    for vehicle_id, mileage in batch:
+        cars[vehicle_id].update_odemeter_reading(mileage)
+
+
+def _swap_sinks(cars, sink):
+    """Point every battery at `sink`; returns what to put back."""
+    saved = []
+    for car in cars.values() if hasattr(cars, 'values') else cars:
+        battery = getattr(car, 'battery', None)
+        if battery is not None:
+            saved.append((battery, battery.sink))
+            battery.sink = sink
+    return saved
+
+
+def _discard(message):
+    pass
+
+
+def replay(cars, events, batch_size=50_000, sink=None, on_batch=None):
+    """Apply (vehicle_id, mileage) events, in order, to a Fleet or to Car objects indexed by id.
+
+    Battery messages go to `sink` instead of the cars' own sinks (which are put back
+    afterwards); sink=None drops them. Events may also be an (n, 2) int array, which a
+    Fleet takes without any per-event work. on_batch(stats) is called after every batch.
+    Returns ReplayStats.
+    """
+    stats = ReplayStats()
+    start = time.perf_counter()
+    fleet = isinstance(cars, Fleet)
+    saved = [] if fleet else _swap_sinks(cars, sink or _discard)
+    try:
+        for batch in iter_batches(events, batch_size):
+            if fleet:
+                _replay_fleet(cars, batch, sink)
+            else:
+                _replay_cars(cars, batch)
+            stats.events += len(batch)
+            stats.batches += 1
+            stats.seconds = time.perf_counter() - start
+            if on_batch is not None:
+                on_batch(stats)
+    finally:
+        for battery, original in saved:
+            battery.sink = original
+        if isinstance(sink, BufferedSink):
+            sink.flush()
+    stats.seconds = time.perf_counter() - start
+    return stats
+
+
+def benchmark(vehicles=10_000, events=1_000_000, seed=0):
+    """A day of telemetry: per-event prints vs buffered, silent and Fleet replays."""
+    import contextlib
+    import os
+
+    from car import Car, ElectricCar
+
+    rng = np.random.default_rng(seed)
+    electric = (rng.random(vehicles) < 0.5).tolist()
+    day = list(zip(rng.integers(0, vehicles, events).tolist(), rng.integers(0, 300_000, events).tolist()))
+
+    def new_cars():
+        return [(ElectricCar if e else Car)('BYD', 'spa', 2025) for e in electric]
+
+    # Line buffered like a terminal: one write() system call per print.
+    with open(os.devnull, 'w', buffering=1) as devnull:
+        cars = new_cars()
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(devnull):
+            for vehicle_id, mileage in day:
+                cars[vehicle_id].update_odemeter_reading(mileage)
+        print(f"print per event:  {events / (time.perf_counter() - start):>12,.0f} events/s")
+        expected = [car.odemeter_reading for car in cars]
+
+        with BufferedSink(devnull) as sink:
+            print(f"buffered sink:    {replay(new_cars(), day, sink=sink).rate:>12,.0f} events/s")
+        print(f"silent:           {replay(new_cars(), day).rate:>12,.0f} events/s")
+
+        fleet = Fleet(capacity=vehicles)
+        fleet.extend(['BYD'] * vehicles, ['spa'] * vehicles, [2025] * vehicles, 0,
+                     [40 if e else -1 for e in electric])
+        with BufferedSink(devnull) as sink:
+            print(f"Fleet, buffered:  {replay(fleet, day, sink=sink).rate:>12,.0f} events/s")
+        print(f"Fleet, silent:    {replay(fleet, day).rate:>12,.0f} events/s")
+        assert fleet.column('odometer').tolist() == expected
+        print(f"Fleet, array:     {replay(fleet, np.array(day)).rate:>12,.0f} events/s")
+
+
+if __name__ == '__main__':
+    benchmark()
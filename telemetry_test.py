@@ -0,0 +1,33 @@
+import io
+
+import pytest
+from car import Car, ElectricCar
+from fleet import Fleet
+from telemetry import BufferedSink, replay
+
+@pytest.fixture
+def events():
+    return [(1, 100), (0, 50), (1, 30), (2, 90), (1, 45)]
+
+def test_replay_into_cars_is_silent_and_restores_sinks(events, capsys):
+    cars = [Car("BYD", "spa", 2025), ElectricCar("Tesla", "3", 2024), ElectricCar("BYD", "e6", 2020)]
+    stream = io.StringIO()
+    with BufferedSink(stream, capacity=2) as sink:
+        stats = replay(cars, events, batch_size=2, sink=sink)
+    assert (stats.events, stats.batches) == (5, 3)
+    assert [car.odemeter_reading for car in cars] == [50, 5, 50]
+    assert sink.count == 4 and stream.getvalue().count("40 kwh") == 4
+    assert capsys.readouterr().out == ""
+
+    replay(cars, events)
+    assert capsys.readouterr().out == ""
+    cars[1].update_odemeter_reading(1)  # the car's own sink is back
+    assert capsys.readouterr().out == "This battery has a 40 kwh battery.\n"
+
+def test_replay_into_fleet_matches_cars(events):
+    fleet = Fleet()
+    fleet.extend(["BYD", "Tesla", "BYD"], ["spa", "3", "e6"], [2025, 2024, 2020], 0, [-1, 40, 40])
+    sink = BufferedSink(None)
+    replay(fleet, events, batch_size=2, sink=sink)
+    assert fleet.column("odometer").tolist() == [50, 5, 50]
+    assert sink.count == 4